@@ -2,12 +2,443 @@
 Image to WebP Converter Core Module
 Handles the conversion logic and folder structure replication
 """
+import fnmatch
+import hashlib
+import io
+import json
 import os
+import queue
+import re
 import shutil
+import sqlite3
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, wait, FIRST_COMPLETED
 from pathlib import Path
-from PIL import Image, ImageEnhance, ImageFilter
+from PIL import Image, ImageEnhance, ImageFilter, ImageStat
 import numpy as np
-from typing import Callable, Optional
+from typing import Callable, Iterator, NamedTuple, Optional
+
+try:
+    import fcntl
+except ImportError:
+    # Not available on Windows; reflink passthrough falls back to copying
+    fcntl = None
+
+# ioctl request cloning a whole file (copy-on-write reflink) on Linux Btrfs/XFS
+FICLONE = 0x40049409
+
+
+class ScanEntry(NamedTuple):
+    """A file found while scanning the source tree"""
+    path: Path
+    relative_dir: Path
+    size: int  # None when the scan did not need to stat the file
+    mtime: float  # None when the scan did not need to stat the file
+    is_image: bool
+
+
+class ScanManifest(NamedTuple):
+    """Result of a single pass over the source tree"""
+    directories: list  # Relative paths of all subdirectories, parents before children
+    files: list  # ScanEntry for every file, in traversal order
+
+
+class ConversionJob(NamedTuple):
+    """An image queued for conversion"""
+    source: Path
+    output_dir: Path
+    entry: ScanEntry = None  # Scan manifest entry the job came from
+    header: tuple = None  # (width, height, mode) from a header probe, if probed
+    memory: int = 0  # Estimated peak memory of the conversion in bytes
+    cost: float = 0.0  # Estimated relative CPU cost of the conversion (file size when headers were not probed)
+    method: int = None  # Reduced WebP method cap set by a time budget (None = configured method)
+    quality: int = None  # Reduced quality cap set by a time budget (None = configured quality)
+
+
+class EncodeResult(NamedTuple):
+    """Outcome of a successful image conversion"""
+    outputs: list  # Paths of all written WebP files
+    content_hash: str = None  # Hash of the source file, if it was computed
+    method: int = None  # WebP method the image was encoded with (None = reused from the output cache)
+    cache_key: str = None  # Output cache entry to store once deferred writes are flushed (pipeline mode)
+    seconds: float = None  # Time the conversion took where it ran
+
+
+class ConversionResult(NamedTuple):
+    """Outcome of one source file, as yielded by iter_convert"""
+    source: Path
+    outputs: list  # Paths of the files written for it (empty on failure)
+    bytes_in: int  # Size of the source file
+    bytes_out: int  # Total size of the outputs
+    seconds: float  # Conversion time (None for copied files and failures)
+    status: str  # 'converted', 'copied' or 'failed'
+    error: Exception = None  # What went wrong, for failures
+
+
+class EncoderSettings(NamedTuple):
+    """WebP encoder settings chosen for one image"""
+    quality: int  # Quality, or the upper bound of the adaptive quality search
+    method: int
+    quality_key: str = None  # Adaptive quality cache key of the output (None = no caching)
+    writes: list = None  # Collects (path, data) instead of writing files (pipeline mode)
+
+
+class SourceIndex:
+    """Persistent SQLite record of converted source files, for incremental conversion"""
+    
+    def __init__(self, path: Path):
+        """
+        Open (or create) the index database
+        
+        Args:
+            path: Path to the SQLite database file
+        """
+        self.connection = sqlite3.connect(str(path))
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS sources ("
+            "relative_path TEXT PRIMARY KEY, size INTEGER, mtime REAL, "
+            "content_hash TEXT, fingerprint TEXT, outputs TEXT)"
+        )
+    
+    def get(self, relative_path: str) -> Optional[tuple]:
+        """Return (size, mtime, content_hash, fingerprint, outputs) for a source, or None"""
+        row = self.connection.execute(
+            "SELECT size, mtime, content_hash, fingerprint, outputs FROM sources WHERE relative_path = ?",
+            (relative_path,)
+        ).fetchone()
+        if row is None:
+            return None
+        return row[0], row[1], row[2], row[3], json.loads(row[4])
+    
+    def update(self, relative_path: str, size: int, mtime: float, content_hash: str, fingerprint: str, outputs: list) -> None:
+        """Record the current state of a converted or copied source"""
+        self.connection.execute(
+            "INSERT OR REPLACE INTO sources VALUES (?, ?, ?, ?, ?, ?)",
+            (relative_path, size, mtime, content_hash, fingerprint, json.dumps(outputs))
+        )
+    
+    def remove(self, relative_path: str) -> None:
+        """Forget a source"""
+        self.connection.execute("DELETE FROM sources WHERE relative_path = ?", (relative_path,))
+    
+    def relative_paths(self) -> list:
+        """All recorded source paths"""
+        return [row[0] for row in self.connection.execute("SELECT relative_path FROM sources")]
+    
+    def close(self) -> None:
+        """Commit pending changes and close the database"""
+        self.connection.commit()
+        self.connection.close()
+
+
+class MetadataCache:
+    """Persistent SQLite record of image headers (dimensions and mode), keyed by path, size and mtime"""
+    
+    def __init__(self, path: Path):
+        """
+        Open (or create) the metadata database
+        
+        Args:
+            path: Path to the SQLite database file
+        """
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Autocommit; several converters may share the file
+        self.connection = sqlite3.connect(str(path), timeout=30, isolation_level=None)
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS headers ("
+            "path TEXT PRIMARY KEY, size INTEGER, mtime REAL, width INTEGER, height INTEGER, mode TEXT)"
+        )
+    
+    def get_header(self, path: str, size: int, mtime: float) -> Optional[tuple]:
+        """(width, height, mode) probed earlier from the same unchanged file, or None"""
+        row = self.connection.execute(
+            "SELECT width, height, mode FROM headers WHERE path = ? AND size = ? AND mtime = ?",
+            (path, size, mtime)
+        ).fetchone()
+        return tuple(row) if row else None
+    
+    def store_headers(self, rows: list) -> None:
+        """
+        Remember probed image headers
+        
+        Args:
+            rows: Tuples of (path, size, mtime, width, height, mode)
+        """
+        # One transaction for the whole batch instead of one commit per row
+        self.connection.execute("BEGIN")
+        try:
+            self.connection.executemany("INSERT OR REPLACE INTO headers VALUES (?, ?, ?, ?, ?, ?)", rows)
+        except Exception:
+            self.connection.execute("ROLLBACK")
+            raise
+        self.connection.execute("COMMIT")
+    
+    def close(self) -> None:
+        """Close the database"""
+        self.connection.close()
+
+
+class OutputCache:
+    """Content-addressed store of encoded WebP files shared across runs, with size-bounded LRU eviction"""
+    
+    def __init__(self, directory: Path, max_bytes: int):
+        """
+        Open (or create) the cache
+        
+        Args:
+            directory: Cache directory
+            max_bytes: Total size of cached files above which least recently used entries are evicted
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.directory.mkdir(parents=True, exist_ok=True)
+        # Autocommit, and wait for other worker processes holding the lock
+        self.connection = sqlite3.connect(str(directory / 'cache.sqlite'), timeout=30, isolation_level=None)
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            "key TEXT PRIMARY KEY, variants TEXT, size INTEGER, last_access REAL)"
+        )
+        self.connection.execute("CREATE TABLE IF NOT EXISTS qualities (key TEXT PRIMARY KEY, quality INTEGER)")
+    
+    def _object_path(self, key: str, variant: str) -> Path:
+        """Location of one cached output file"""
+        return self.directory / key[:2] / f"{key}_{variant}.webp"
+    
+    def lookup(self, key: str) -> Optional[dict]:
+        """
+        Find cached outputs and mark them as recently used
+        
+        Args:
+            key: Cache key (source hash + settings fingerprint)
+            
+        Returns:
+            Dictionary of variant name -> cached file path, or None on a miss
+        """
+        row = self.connection.execute("SELECT variants FROM entries WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        
+        paths = {variant: self._object_path(key, variant) for variant in json.loads(row[0])}
+        if not all(path.exists() for path in paths.values()):
+            self.connection.execute("DELETE FROM entries WHERE key = ?", (key,))
+            return None
+        
+        self.connection.execute("UPDATE entries SET last_access = ? WHERE key = ?", (time.time(), key))
+        return paths
+    
+    def store(self, key: str, outputs: dict) -> None:
+        """
+        Add encoded outputs to the cache, then evict old entries beyond max_bytes
+        
+        Args:
+            key: Cache key (source hash + settings fingerprint)
+            outputs: Dictionary of variant name -> encoded file path
+        """
+        size = 0
+        for variant, path in outputs.items():
+            object_path = self._object_path(key, variant)
+            object_path.parent.mkdir(exist_ok=True)
+            _link_or_copy(path, object_path)
+            size += object_path.stat().st_size
+        
+        self.connection.execute(
+            "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?)",
+            (key, json.dumps(list(outputs)), size, time.time())
+        )
+        self._evict()
+    
+    def get_quality(self, key: str) -> Optional[int]:
+        """Quality chosen by an earlier adaptive encode of the same content and settings, or None"""
+        row = self.connection.execute("SELECT quality FROM qualities WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+    
+    def set_quality(self, key: str, quality: int) -> None:
+        """Remember the quality chosen by an adaptive encode"""
+        self.connection.execute("INSERT OR REPLACE INTO qualities VALUES (?, ?)", (key, quality))
+    
+    def _evict(self) -> None:
+        """Remove least recently used entries until the cache fits max_bytes"""
+        total = self.connection.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        
+        rows = self.connection.execute("SELECT key, variants, size FROM entries ORDER BY last_access").fetchall()
+        for key, variants, size in rows:
+            if total <= self.max_bytes:
+                break
+            for variant in json.loads(variants):
+                self._object_path(key, variant).unlink(missing_ok=True)
+            self.connection.execute("DELETE FROM entries WHERE key = ?", (key,))
+            total -= size
+
+
+class TimeBudget:
+    """Wall-clock budget of a folder conversion, stepping encoder settings down when the projected finish is late"""
+    
+    def __init__(self, deadline: float, steps: list, remaining_cost: float):
+        """
+        Start tracking a budget
+        
+        Args:
+            deadline: time.monotonic() value the conversion should finish by
+            steps: (method, quality) settings from the configured ones to the fastest
+            remaining_cost: Total estimated cost of the jobs to run
+        """
+        self.deadline = deadline
+        self.steps = steps
+        self.step = 0
+        self.remaining_cost = remaining_cost
+        # Cost completed since the current step started, for the measured rate
+        self._window_start = time.monotonic()
+        self._window_cost = 0.0
+    
+    @property
+    def degraded(self) -> bool:
+        """Whether settings below the configured ones are in use"""
+        return self.step > 0
+    
+    @property
+    def settings(self) -> tuple:
+        """(method, quality) for the next job"""
+        return self.steps[self.step]
+    
+    def job_done(self, cost: float) -> None:
+        """
+        Account for a finished job, stepping down when the measured rate projects a late finish
+        
+        Args:
+            cost: Estimated cost of the finished job
+        """
+        self.remaining_cost -= cost
+        self._window_cost += cost
+        if self.step == len(self.steps) - 1 or self._window_cost <= 0:
+            return
+        
+        now = time.monotonic()
+        projected_finish = now + self.remaining_cost * (now - self._window_start) / self._window_cost
+        if projected_finish > self.deadline:
+            self.step += 1
+            self._window_start = now
+            self._window_cost = 0.0
+
+
+def _link_or_copy(source: Path, destination: Path) -> None:
+    """Hardlink source to destination (replacing it), copying when a link is not possible"""
+    temporary = destination.with_name(f"{destination.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        try:
+            os.link(source, temporary)
+        except OSError:
+            shutil.copy2(source, temporary)
+        os.replace(temporary, destination)
+    except BaseException:
+        temporary.unlink(missing_ok=True)
+        raise
+
+
+def _reflink_or_copy(source: Path, destination: Path) -> None:
+    """
+    Copy source to destination (replacing it) as cheaply as the filesystem allows
+    
+    Tries a copy-on-write reflink, then an in-kernel copy_file_range, then a plain
+    userspace copy. Metadata is copied like shutil.copy2.
+    """
+    temporary = destination.with_name(f"{destination.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        with open(source, 'rb') as source_file, open(temporary, 'wb') as temporary_file:
+            try:
+                if fcntl is None:
+                    raise OSError("reflink not supported")
+                fcntl.ioctl(temporary_file.fileno(), FICLONE, source_file.fileno())
+            except OSError:
+                _copy_file_contents(source_file, temporary_file)
+        shutil.copystat(source, temporary)
+        os.replace(temporary, destination)
+    except BaseException:
+        temporary.unlink(missing_ok=True)
+        raise
+
+
+def _copy_file_contents(source_file, destination_file) -> None:
+    """Copy between open files with copy_file_range where supported, else through userspace"""
+    if hasattr(os, 'copy_file_range'):
+        try:
+            while os.copy_file_range(source_file.fileno(), destination_file.fileno(), 1024 ** 3):
+                pass
+            return
+        except OSError:
+            # Cross-filesystem on older kernels, or unsupported: start over with a plain copy
+            source_file.seek(0)
+            destination_file.seek(0)
+            destination_file.truncate()
+    shutil.copyfileobj(source_file, destination_file)
+
+
+def _copy_replacing(source: Path, destination: Path) -> None:
+    """
+    Copy source to destination like shutil.copy2, replacing what is there
+    
+    The copy is written to a temporary name first, so a hardlink or symlink to the source
+    left by another passthrough mode is replaced rather than written through.
+    """
+    temporary = destination.with_name(f"{destination.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        shutil.copy2(source, temporary)
+        os.replace(temporary, destination)
+    except BaseException:
+        temporary.unlink(missing_ok=True)
+        raise
+
+
+def _symlink(source: Path, destination: Path) -> None:
+    """Point destination (replacing it) at the absolute source path"""
+    temporary = destination.with_name(f"{destination.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        os.symlink(os.path.abspath(source), temporary)
+        os.replace(temporary, destination)
+    except BaseException:
+        temporary.unlink(missing_ok=True)
+        raise
+
+
+def _default_metadata_cache_path() -> Path:
+    """Header database in the per-user cache directory of the platform"""
+    if sys.platform == 'win32':
+        root = os.environ.get('LOCALAPPDATA') or os.path.expanduser('~/AppData/Local')
+    elif sys.platform == 'darwin':
+        root = os.path.expanduser('~/Library/Caches')
+    else:
+        root = os.environ.get('XDG_CACHE_HOME') or os.path.expanduser('~/.cache')
+    return Path(root) / 'image-to-webp' / 'metadata.sqlite'
+
+
+def _usable_cpu_count() -> int:
+    """Number of CPUs this process is allowed to run on"""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        # sched_getaffinity is not available on Windows/macOS
+        return os.cpu_count() or 1
+
+
+# Converter instance installed in each worker process by _init_worker
+_worker_converter = None
+
+
+def _init_worker(converter: "ImageToWebPConverter") -> None:
+    """Process pool initializer: keep a copy of the converter settings in the worker"""
+    global _worker_converter
+    _worker_converter = converter
+
+
+def _convert_in_worker(image_path: Path, output_dir: Path, max_method: int = None, max_quality: int = None) -> "EncodeResult":
+    """Process pool entry point: convert one image in a worker process"""
+    start = time.perf_counter()
+    result = _worker_converter._encode_image(image_path, output_dir, max_method=max_method, max_quality=max_quality)
+    return result._replace(seconds=time.perf_counter() - start)
 
 
 class ImageToWebPConverter:
@@ -16,7 +447,68 @@ class ImageToWebPConverter:
     # Supported image formats
     SUPPORTED_FORMATS = {'.jpg', '.jpeg', '.png', '.bmp', '.tiff', '.tif', '.gif'}
     
-    def __init__(self, quality: int = 85, lossless: bool = False, method: int = 6, target_width: int = None, preserve_alpha: bool = True, create_bw: bool = False, fine_tuning: dict = None, make_horizontal: bool = False, uniform_size: bool = False, uniform_orientation: str = "horizontal"):
+    # Resample modes: reducing_gap for Image.resize (None = full LANCZOS over the whole source).
+    # Smaller gaps pre-shrink more with a fast integer reduce() before the final LANCZOS pass.
+    RESAMPLE_MODES = {'quality': None, 'balanced': 3.0, 'fast': 2.0}
+    
+    # Grid size for compiled fine-tuning LUTs; 52 nodes put every grid point on an exact 8-bit value (step 5)
+    LUT_SIZE = 52
+    
+    # Largest difference (8-bit levels) a manual fine-tuning LUT may have from stage-by-stage processing.
+    # Each compiled LUT is checked at the centre of every grid cell, where interpolation is furthest from
+    # the nodes, against one level less; LUTs that miss it (extreme settings) fall back to the stages.
+    FINE_TUNING_LUT_TOLERANCE = 6
+    
+    # Float working memory per row chunk in the tone adjustment engine
+    TONE_CHUNK_BYTES = 32 * 1024 * 1024
+    
+    # ProcessPoolExecutor rejects more than 61 workers on Windows (WaitForMultipleObjects limit)
+    WINDOWS_MAX_WORKERS = 61
+    
+    # Rough working memory per output pixel of the WebP encoder
+    ENCODER_BYTES_PER_PIXEL = 8
+    
+    # Relative CPU cost per pixel of each stage, for ordering jobs by estimated cost
+    STAGE_COST_WEIGHTS = {'decode': 1.0, 'encode': 4.0, 'fine_tuning': 1.0, 'auto_tone': 2.0, 'bw': 4.5}
+    
+    # Index database kept in the output folder by incremental conversion
+    INDEX_FILE_NAME = '.towebp_index.sqlite'
+    COPY_FINGERPRINT = 'copy'  # Index fingerprint of non-image files copied as-is
+    
+    # How non-image files reach the output folder: hardlinks share the source inode (falling back to a copy
+    # across filesystems), reflinks share blocks copy-on-write (falling back to copy_file_range, then a copy)
+    PASSTHROUGH_MODES = ('copy', 'hardlink', 'reflink', 'symlink', 'skip')
+    
+    # Versioned output names: name_WebP_<n> (folders), name_WebP_<n>.webp (files)
+    # and name_WebP_<n>_<width>w.webp / name_WebP_<n>_<width>w_bw.webp (responsive files)
+    VERSIONED_NAME = re.compile(r'^(.*)_WebP_(\d+)((?:_\d+w)?(?:_bw)?\.webp)?$')
+    
+    # Suggested exclude_patterns: VCS metadata, package folders and NAS/OS thumbnail files
+    COMMON_EXCLUDES = ('.git', '.svn', '.hg', 'node_modules', '@eaDir', '.DS_Store', 'Thumbs.db', 'desktop.ini')
+    
+    # Job scheduling policies: biggest estimated cost first, or scan (traversal) order
+    JOB_ORDERS = ('largest_first', 'scan')
+    
+    # How far past the head of the queue the memory scheduler looks for a job that fits
+    # (once per head job: after passing it over, the scheduler waits until the head fits)
+    ADMISSION_LOOKAHEAD = 64
+    
+    # Threads reading image headers in the probe stage (I/O bound, so more than the CPU count)
+    PROBE_THREADS = 8
+    
+    # Longest side of the proxy image auto tone statistics are measured on
+    AUTO_TONE_PROXY_SIZE = 512
+    
+    # Adaptive method policy: encode time per pixel of each WebP method relative to method 4,
+    # and the starting method 4 rate (refined from measured encodes while converting)
+    METHOD_COST_FACTORS = {0: 0.35, 1: 0.35, 2: 0.5, 3: 1.0, 4: 1.0, 5: 1.0, 6: 1.4}
+    ENCODE_SECONDS_PER_PIXEL = 125e-9
+    
+    # Time budget fallbacks, tried in order: faster methods, then lower quality (points below quality)
+    TIME_BUDGET_METHODS = (4, 2, 0)
+    TIME_BUDGET_QUALITY_DROPS = (10, 20, 30)
+    
+    def __init__(self, quality: int = 85, lossless: bool = False, method: int = 6, target_width: int = None, preserve_alpha: bool = True, create_bw: bool = False, fine_tuning: dict = None, make_horizontal: bool = False, uniform_size: bool = False, uniform_orientation: str = "horizontal", workers: int = None, resample_mode: str = "quality", fine_tuning_lut: bool = True, tile_threshold: int = 40_000_000, tile_memory_budget: int = 64 * 1024 * 1024, memory_budget: int = None, job_order: str = "largest_first", incremental: bool = False, prune_deleted: bool = False, cache_dir: str = None, cache_max_bytes: int = 2 * 1024 ** 3, target_widths: list = None, target_bytes: int = None, target_psnr: float = None, min_quality: int = 10, max_encode_attempts: int = 7, target_throughput: float = None, batch_deadline: float = None, pipeline: bool = False, prefetch_depth: int = 4, passthrough: str = "copy", io_workers: int = 4, include_patterns: list = None, exclude_patterns: list = None, scan_workers: int = 1, metadata_cache: str = None):
         """
         Initialize converter with settings
         
@@ -31,28 +523,132 @@ class ImageToWebPConverter:
             make_horizontal: If True, vertical images will be padded to match target width (landscape mode)
             uniform_size: If True, all images will be cropped to same dimensions
             uniform_orientation: Target orientation for uniform size ('horizontal' or 'vertical')
+            workers: Number of worker processes for folder conversion (None = all usable CPUs, 1 = no process pool; at most 61 on Windows)
+            resample_mode: Resize quality/speed tradeoff ('quality', 'balanced' or 'fast')
+            fine_tuning_lut: Apply manual fine-tuning as one compiled 3D LUT pass (False = exact stage-by-stage processing)
+            tile_threshold: Pixel count above which pixel-wise stages run on horizontal strips (None = never)
+            tile_memory_budget: Working memory in bytes a single strip may use
+            memory_budget: Estimated peak memory in bytes parallel conversions may use together (None = unlimited)
+            job_order: Order of parallel jobs ('largest_first' by estimated cost, or 'scan' order)
+            incremental: Convert folders into a stable <source>_WebP folder, skipping sources unchanged since the last run
+            prune_deleted: In incremental mode, delete outputs whose source no longer exists
+            cache_dir: Directory of a content-addressed output cache shared across runs (None = no cache)
+            cache_max_bytes: Size limit of the output cache; least recently used entries are evicted
+            target_widths: Responsive mode: write every image at each of these widths from a single decode,
+                as name_<width>w.webp (replaces target_width, which becomes the largest width)
+            target_bytes: Adaptive mode: highest quality (between min_quality and quality) whose file fits this size
+            target_psnr: Adaptive mode: lowest quality (between min_quality and quality) reaching this PSNR in dB
+            min_quality: Lowest quality the adaptive search may choose
+            max_encode_attempts: Maximum trial encodes per output file in adaptive mode
+            target_throughput: Adaptive method: images per second to sustain; each image uses the slowest
+                method up to `method` whose estimated encode time fits (None = no throughput target)
+            batch_deadline: Adaptive method: seconds a folder conversion should take (None = no deadline)
+            pipeline: Without a process pool, overlap reading and writing files with conversion on helper threads
+            prefetch_depth: Pipeline mode: images read ahead, and images waiting to be written, at most
+            passthrough: How non-image files are placed in the output folder ('copy', 'hardlink', 'reflink',
+                'symlink' or 'skip'). Hardlinked files share their contents with the source.
+            io_workers: Threads placing non-image files, alongside image conversion
+            include_patterns: Glob patterns (file name or path relative to the source folder) a file must match
+                to be converted or copied (None = all files)
+            exclude_patterns: Glob patterns of files and directories to leave out; excluded directories are
+                never descended into (e.g. COMMON_EXCLUDES)
+            scan_workers: Threads listing directories in parallel while scanning (for high-latency mounts)
+            metadata_cache: SQLite file caching image headers across runs (None = metadata.sqlite in the
+                user cache directory); an unusable location only disables the persistent cache
         """
+        if resample_mode not in self.RESAMPLE_MODES:
+            raise ValueError(f"Unknown resample mode: {resample_mode}")
+        if job_order not in self.JOB_ORDERS:
+            raise ValueError(f"Unknown job order: {job_order}")
+        if passthrough not in self.PASSTHROUGH_MODES:
+            raise ValueError(f"Unknown passthrough mode: {passthrough}")
+        if target_bytes is not None and target_psnr is not None:
+            raise ValueError("Use either target_bytes or target_psnr, not both")
+        if lossless and (target_bytes is not None or target_psnr is not None):
+            raise ValueError("target_bytes and target_psnr require lossy compression")
+        
         self.quality = quality
         self.lossless = lossless
         self.method = method
-        self.target_width = target_width
+        self.target_widths = sorted(set(target_widths), reverse=True) if target_widths else None
+        # The largest responsive width drives resizing; smaller ones are derived from it
+        self.target_width = self.target_widths[0] if self.target_widths else target_width
         self.preserve_alpha = preserve_alpha
         self.create_bw = create_bw
         self.fine_tuning = fine_tuning or {}
         self.make_horizontal = make_horizontal
         self.uniform_size = uniform_size
         self.uniform_orientation = uniform_orientation
+        self.workers = workers if workers and workers > 0 else _usable_cpu_count()
+        if sys.platform == 'win32':
+            self.workers = min(self.workers, self.WINDOWS_MAX_WORKERS)
+        self.resample_mode = resample_mode
+        self.fine_tuning_lut = fine_tuning_lut
+        self._lut_cache = {}  # Compiled fine-tuning LUTs keyed by contrast mean (None = too inexact, use the stages)
+        self.tile_threshold = tile_threshold
+        self.tile_memory_budget = tile_memory_budget
+        self.memory_budget = memory_budget
+        self.job_order = job_order
+        self.incremental = incremental
+        self.prune_deleted = prune_deleted
+        self.cache_dir = cache_dir
+        self.cache_max_bytes = cache_max_bytes
+        self._output_cache = None  # Opened per process on first use
+        self.target_bytes = target_bytes
+        self.target_psnr = target_psnr
+        self.min_quality = min_quality
+        self.max_encode_attempts = max_encode_attempts
+        self._quality_cache = {}  # Adaptive qualities chosen in this process, keyed by content + settings + variant
+        self.target_throughput = target_throughput
+        self.batch_deadline = batch_deadline
+        self._encode_rate = self.ENCODE_SECONDS_PER_PIXEL  # Measured method 4 encode seconds per pixel
+        self._encode_rate_lock = threading.Lock()  # Encodes are timed on the helper encoder thread too
+        self._encoder_thread = None  # Helper thread encoding colour versions beside B&W ones, started on first use
+        self._method_time_allowance = None  # Encode seconds per image allowed by the throughput target
+        self.method_report = {}  # Source path -> WebP method used, for the last conversion
+        self.degraded_files = {}  # Source path -> (method, quality) caps a time budget converted it with
+        self._header_cache = {}  # (path, size, mtime) -> (width, height, mode) probed in this process
+        self.metadata_cache = metadata_cache
+        self._metadata_cache = None  # Opened on first use; False once it could not be opened
+        self.pipeline = pipeline
+        self.prefetch_depth = max(1, prefetch_depth)
+        self.passthrough = passthrough
+        self.io_workers = max(1, io_workers)
+        self._name_indexes = {}  # Directory -> (mtime, names present, {name: highest version present}) for versioned names
+        self.include_patterns = include_patterns
+        self.exclude_patterns = exclude_patterns
+        self._include = self._compile_patterns(include_patterns)
+        self._exclude = self._compile_patterns(exclude_patterns)
+        self.scan_workers = max(1, scan_workers)
         self.total_files = 0
         self.processed_files = 0
+        self.skipped_files = 0
         self.errors = []
         self.should_stop = False
         self.uniform_dimensions = None  # Will store calculated uniform dimensions
-        
+        self.output_folder = None  # Output folder of the current or last folder conversion
+        
+    def __getstate__(self) -> dict:
+        """Pickle settings for worker processes, without per-process resources"""
+        state = self.__dict__.copy()
+        state['_output_cache'] = None
+        state['_header_cache'] = {}
+        state['_metadata_cache'] = None
+        state['_encoder_thread'] = None
+        del state['_encode_rate_lock']
+        return state
+    
+    def __setstate__(self, state: dict) -> None:
+        """Restore pickled settings in a worker process"""
+        self.__dict__.update(state)
+        self._encode_rate_lock = threading.Lock()
+    
     def convert_folder(
         self, 
         source_folder: str, 
         output_folder: str = None,
-        progress_callback: Optional[Callable[[str, int, int], None]] = None
+        progress_callback: Optional[Callable[[str, int, int], None]] = None,
+        time_budget: float = None
     ) -> tuple[str, int, int, list]:
         """
         Convert all images in source folder to WebP, maintaining folder structure
@@ -61,16 +657,57 @@ class ImageToWebPConverter:
             source_folder: Path to source folder
             output_folder: Optional custom output folder path
             progress_callback: Optional callback(message, current, total)
+            time_budget: Wall-clock seconds the conversion should take. Conversion starts at the configured
+                settings and steps down to faster methods, then lower quality, whenever the measured rate
+                projects a later finish; affected files are listed in degraded_files (None = no budget)
             
         Returns:
             Tuple of (output_folder, total_files, processed_files, errors)
+            
+        In incremental mode, total_files only counts images that needed converting;
+        unchanged images are counted in skipped_files.
+        """
+        for _ in self.iter_convert(source_folder, output_folder, progress_callback, time_budget):
+            pass
+        
+        return self.output_folder, self.total_files, self.processed_files, self.errors
+    
+    def iter_convert(
+        self,
+        source_folder: str,
+        output_folder: str = None,
+        progress_callback: Optional[Callable[[str, int, int], None]] = None,
+        time_budget: float = None
+    ) -> Iterator[ConversionResult]:
+        """
+        Convert a folder like convert_folder, yielding a result record as each file finishes
+        
+        Records come in completion order (with workers > 1 that differs from scan order), so
+        outputs can be uploaded or post-processed while the rest of the folder converts.
+        Non-image files are yielded too, with status 'copied'. The output folder is available
+        as output_folder once iteration has started; the counters are updated as in convert_folder.
+        
+        Args:
+            source_folder: Path to source folder
+            output_folder: Optional custom output folder path
+            progress_callback: Optional callback(message, current, total)
+            time_budget: Wall-clock seconds the conversion should take (see convert_folder)
+            
+        Yields:
+            ConversionResult per converted, copied or failed source file
         """
+        deadline = time.monotonic() + time_budget if time_budget is not None else None
         source_path = Path(source_folder)
         if not source_path.exists():
             raise ValueError(f"Source folder does not exist: {source_folder}")
             
         # Determine output folder
-        if output_folder:
+        if self.incremental:
+            # Stable output folder so later runs can update it in place
+            output_path = Path(output_folder) if output_folder else None
+            if output_path is None or output_path == source_path:
+                output_path = Path(f"{source_folder}_WebP")
+        elif output_folder:
             output_path = Path(output_folder)
             # If custom folder, we use it directly (creating if needed)
             # We don't append _WebP unless it's the same as source to avoid confusion
@@ -85,22 +722,60 @@ class ImageToWebPConverter:
         # Reset counters
         self.total_files = 0
         self.processed_files = 0
+        self.skipped_files = 0
         self.errors = []
+        self.method_report = {}
+        self.degraded_files = {}
+        # Entries not stat'ed by the scan are cached by path only, which holds for one run
+        self._header_cache = {}
+        
+        # Walk the source tree once; every later stage works from this manifest
+        manifest = self._scan_source(source_path)
         
         # Count total files first
-        self._count_images(source_path)
+        self._count_images(manifest)
         
         # Analyze folder for uniform size if enabled
         if self.uniform_size and self.target_width:
-            self.uniform_dimensions = self._calculate_uniform_dimensions(source_path, progress_callback)
+            self.uniform_dimensions = self._calculate_uniform_dimensions(manifest, progress_callback)
         
         # Create output folder
         output_path.mkdir(parents=True, exist_ok=True)
+        self._remember_output_name(output_path)
+        self.output_folder = str(output_path)
         
-        # Process all files
-        self._process_directory(source_path, output_path, source_path, progress_callback)
-        
-        return str(output_path), self.total_files, self.processed_files, self.errors
+        index = SourceIndex(output_path / self.INDEX_FILE_NAME) if self.incremental else None
+        try:
+            # Non-image files are placed on I/O threads while images convert
+            with ThreadPoolExecutor(max_workers=self.io_workers) as io_executor:
+                # Replicate folder structure and collect image jobs
+                jobs, passthrough = self._process_manifest(manifest, output_path, progress_callback, index, io_executor)
+                
+                if index is not None:
+                    if self.prune_deleted:
+                        self._prune_index(index, manifest, output_path)
+                    self.total_files = len(jobs)
+                    if progress_callback and self.skipped_files:
+                        progress_callback(f"⏭️ Skipped {self.skipped_files} unchanged images", 0, self.total_files)
+                
+                # Convert all collected images, reporting non-image files as they are placed
+                self._plan_method_allowance(len(jobs), min(self.workers, len(jobs)))
+                for result in self._run_jobs(jobs, progress_callback, index, output_path, deadline):
+                    yield result
+                    yield from self._finish_passthrough(passthrough, index, wait_all=False)
+                
+                yield from self._finish_passthrough(passthrough, index)
+            
+            if progress_callback and self.degraded_files:
+                progress_callback(
+                    f"⏱️ {len(self.degraded_files)} images converted at reduced settings to meet the time budget",
+                    self.processed_files,
+                    self.total_files
+                )
+        finally:
+            if index is not None:
+                index.close()
+            self._close_encoder_thread()
     
     def convert_single_file(
         self,
@@ -135,6 +810,8 @@ class ImageToWebPConverter:
         self.processed_files = 0
         self.errors = []
         self.should_stop = False
+        self.method_report = {}
+        self._plan_method_allowance(1, 1)
         
         # Determine output directory
         if output_folder:
@@ -146,201 +823,1411 @@ class ImageToWebPConverter:
         # Create output file path with versioning
         output_file = self._get_unique_file_name(source_path, output_dir)
         
-        # Convert the file (check for stop)
-        if not self.should_stop:
-            self._convert_image(source_path, output_dir, progress_callback, output_file)
+        # Convert the file (check for stop)
+        if not self.should_stop:
+            try:
+                self._convert_image(source_path, output_dir, progress_callback, output_file)
+            finally:
+                self._close_encoder_thread()
+            for path in self._output_paths(source_path, output_dir, output_file).values():
+                if path.exists():
+                    self._remember_output_name(path)
+        
+        # Responsive mode writes width variants; report the largest one
+        if self.target_widths:
+            output_file = next(iter(self._output_paths(source_path, output_dir, output_file).values()))
+        
+        return str(output_file), self.total_files, self.processed_files, self.errors
+    
+    def _scan_source(self, root: Path) -> ScanManifest:
+        """
+        Walk the source tree once with os.scandir and record every directory and file
+        
+        Entry types come from the directory listing itself; files are only stat'ed when size and
+        mtime are needed (incremental runs, cache_dir, and header cache keys for uniform-size
+        analysis). Excluded directories are not listed.
+        With scan_workers > 1, directories are listed on a thread pool; the manifest order is
+        the same either way.
+        
+        Args:
+            root: Root source directory
+            
+        Returns:
+            ScanManifest with relative directories and file entries
+        """
+        listings = {}  # Relative directory -> ScanEntry and (path, relative_dir) subdirectory items
+        if self.scan_workers > 1:
+            with ThreadPoolExecutor(max_workers=self.scan_workers) as executor:
+                pending = {executor.submit(self._list_directory, str(root), Path()): Path()}
+                while pending:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        listing = listings[pending.pop(future)] = future.result()
+                        for item in listing:
+                            if not isinstance(item, ScanEntry):
+                                pending[executor.submit(self._list_directory, *item)] = item[1]
+        else:
+            stack = [(str(root), Path())]
+            while stack:
+                directory, relative_dir = stack.pop()
+                listing = listings[relative_dir] = self._list_directory(directory, relative_dir)
+                stack.extend(item for item in listing if not isinstance(item, ScanEntry))
+        
+        # Depth-first, in listing order: parents before children
+        manifest = ScanManifest([], [])
+        
+        def flatten(relative_dir: Path) -> None:
+            for item in listings[relative_dir]:
+                if isinstance(item, ScanEntry):
+                    manifest.files.append(item)
+                else:
+                    manifest.directories.append(item[1])
+                    flatten(item[1])
+        
+        flatten(Path())
+        return manifest
+    
+    def _list_directory(self, directory: str, relative_dir: Path) -> list:
+        """
+        List one source directory
+        
+        Args:
+            directory: Directory path
+            relative_dir: Its path relative to the source root
+            
+        Returns:
+            List of ScanEntry for files and (path, relative_dir) for subdirectories, in listing order
+        """
+        need_stat = self.incremental or self.cache_dir is not None or bool(self.uniform_size and self.target_width)
+        listing = []
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                relative_path = relative_dir / entry.name
+                if self._is_excluded(entry.name, relative_path):
+                    continue
+                if entry.is_file():
+                    if self._include is not None and not self._matches(self._include, entry.name, relative_path):
+                        continue
+                    stat = entry.stat() if need_stat else None
+                    listing.append(ScanEntry(
+                        Path(entry.path),
+                        relative_dir,
+                        stat.st_size if stat else None,
+                        stat.st_mtime if stat else None,
+                        os.path.splitext(entry.name)[1].lower() in self.SUPPORTED_FORMATS
+                    ))
+                elif entry.is_dir():
+                    listing.append((entry.path, relative_path))
+        return listing
+    
+    def _compile_patterns(self, patterns: Optional[list]) -> Optional[re.Pattern]:
+        """Combine glob patterns into one case-normalised regular expression (None if no patterns)"""
+        if not patterns:
+            return None
+        return re.compile('|'.join(fnmatch.translate(os.path.normcase(pattern)) for pattern in patterns))
+    
+    def _matches(self, pattern: re.Pattern, name: str, relative_path: Path) -> bool:
+        """Whether a compiled pattern matches an entry's name or its path relative to the source root"""
+        return bool(
+            pattern.match(os.path.normcase(name))
+            or pattern.match(os.path.normcase(relative_path.as_posix()))
+        )
+    
+    def _is_excluded(self, name: str, relative_path: Path) -> bool:
+        """Whether an entry matches exclude_patterns"""
+        return self._exclude is not None and self._matches(self._exclude, name, relative_path)
+    
+    def _count_images(self, manifest: ScanManifest) -> None:
+        """Count total number of images to process"""
+        self.total_files = sum(1 for entry in manifest.files if entry.is_image)
+    
+    def _process_manifest(
+        self,
+        manifest: ScanManifest,
+        output_root: Path,
+        progress_callback: Optional[Callable[[str, int, int], None]] = None,
+        index: SourceIndex = None,
+        io_executor: ThreadPoolExecutor = None
+    ) -> tuple[list, list]:
+        """
+        Replicate the scanned folder structure, start placing non-image files and collect image jobs
+        
+        Args:
+            manifest: Scan manifest of the source tree
+            output_root: Root output directory
+            progress_callback: Progress callback function
+            index: Source index of an incremental run (unchanged sources are skipped)
+            io_executor: Thread pool placing non-image files
+            
+        Returns:
+            Tuple of (list of ConversionJob, list of (ScanEntry, destination, Future) for non-image files)
+        """
+        fingerprint = self._settings_fingerprint() if index is not None else None
+        passthrough_fingerprint = self._passthrough_fingerprint()
+        
+        # Create corresponding subdirectories (without _WebP suffix)
+        for relative_dir in manifest.directories:
+            (output_root / relative_dir).mkdir(exist_ok=True)
+        
+        jobs = []
+        passthrough = []
+        for entry in manifest.files:
+            # Check if stop requested
+            if self.should_stop:
+                break
+            
+            output_dir = output_root / entry.relative_dir
+            if entry.is_image:
+                if index is not None and self._is_up_to_date(index, entry, fingerprint):
+                    self.skipped_files += 1
+                    continue
+                jobs.append(ConversionJob(entry.path, output_dir, entry))
+            elif self.passthrough != 'skip':
+                if index is not None and self._is_up_to_date(index, entry, passthrough_fingerprint):
+                    continue
+                # Place non-image files as-is
+                destination = output_dir / entry.path.name
+                passthrough.append((entry, destination, io_executor.submit(self._place_file, entry.path, destination)))
+        
+        return jobs, passthrough
+    
+    def _place_file(self, source: Path, destination: Path) -> None:
+        """Put a non-image file into the output folder with the passthrough mode"""
+        if self.passthrough == 'hardlink':
+            _link_or_copy(source, destination)
+        elif self.passthrough == 'reflink':
+            _reflink_or_copy(source, destination)
+        elif self.passthrough == 'symlink':
+            _symlink(source, destination)
+        else:
+            _copy_replacing(source, destination)
+    
+    def _passthrough_fingerprint(self) -> str:
+        """Index fingerprint of non-image files placed with the current passthrough mode"""
+        if self.passthrough == 'copy':
+            return self.COPY_FINGERPRINT
+        return f"{self.COPY_FINGERPRINT}:{self.passthrough}"
+    
+    def _finish_passthrough(self, passthrough: list, index: SourceIndex = None, wait_all: bool = True) -> Iterator["ConversionResult"]:
+        """
+        Record placed non-image files (or their errors) and remove them from the pending list
+        
+        Args:
+            passthrough: (ScanEntry, destination, Future) triples from _process_manifest
+            index: Source index of an incremental run
+            wait_all: Wait for every file (False = only record files already placed)
+            
+        Yields:
+            ConversionResult of each recorded file
+        """
+        if wait_all and self.should_stop:
+            for _, _, placed in passthrough:
+                placed.cancel()
+        
+        finished = [item for item in passthrough if wait_all or item[2].done()]
+        passthrough[:] = [item for item in passthrough if not (wait_all or item[2].done())]
+        
+        fingerprint = self._passthrough_fingerprint()
+        for entry, destination, placed in finished:
+            if placed.cancelled():
+                continue
+            error = placed.exception()
+            if error is not None:
+                self.errors.append(f"Error copying {entry.path.name}: {str(error)}")
+                yield self._conversion_result(entry.path, entry, [], 'failed', error=error)
+            else:
+                if index is not None:
+                    relative_path = self._relative_source_path(entry)
+                    index.update(relative_path, entry.size, entry.mtime, None, fingerprint, [relative_path])
+                yield self._conversion_result(entry.path, entry, [destination], 'copied')
+    
+    def _relative_source_path(self, entry: ScanEntry) -> str:
+        """Index key of a scanned source file"""
+        return (entry.relative_dir / entry.path.name).as_posix()
+    
+    def _is_up_to_date(self, index: SourceIndex, entry: ScanEntry, fingerprint: str) -> bool:
+        """
+        Check whether a source was already converted (or copied) with the current settings
+        
+        Size and mtime are trusted when they match; otherwise the content hash decides,
+        so touched-but-identical files are not converted again.
+        
+        Args:
+            index: Source index of the incremental run
+            entry: Scanned source file
+            fingerprint: Settings fingerprint the outputs must have been produced with
+            
+        Returns:
+            True if the existing outputs are current
+        """
+        relative_path = self._relative_source_path(entry)
+        record = index.get(relative_path)
+        if record is None:
+            return False
+        
+        size, mtime, content_hash, recorded_fingerprint, outputs = record
+        if recorded_fingerprint != fingerprint:
+            return False
+        if size == entry.size and mtime == entry.mtime:
+            return True
+        if content_hash is not None and content_hash == self._hash_file(entry.path):
+            index.update(relative_path, entry.size, entry.mtime, content_hash, fingerprint, outputs)
+            return True
+        return False
+    
+    def _prune_index(self, index: SourceIndex, manifest: ScanManifest, output_root: Path) -> None:
+        """Delete outputs and index records of sources that no longer exist"""
+        existing = {self._relative_source_path(entry) for entry in manifest.files}
+        for relative_path in index.relative_paths():
+            if relative_path in existing:
+                continue
+            record = index.get(relative_path)
+            for output in record[4]:
+                try:
+                    (output_root / output).unlink()
+                except FileNotFoundError:
+                    pass
+                except Exception as e:
+                    self.errors.append(f"Error pruning {output}: {str(e)}")
+            index.remove(relative_path)
+    
+    def _settings_fingerprint(self) -> str:
+        """Hash of every setting that affects the converted output"""
+        settings = {
+            'quality': self.quality,
+            'lossless': self.lossless,
+            'method': self.method,
+            'target_width': self.target_width,
+            'target_widths': self.target_widths,
+            'preserve_alpha': self.preserve_alpha,
+            'create_bw': self.create_bw,
+            'fine_tuning': self.fine_tuning,
+            'make_horizontal': self.make_horizontal,
+            'uniform_size': self.uniform_size,
+            'uniform_orientation': self.uniform_orientation,
+            'uniform_dimensions': self.uniform_dimensions,
+            'resample_mode': self.resample_mode,
+            'fine_tuning_lut': self.fine_tuning_lut,
+            'tile_threshold': self.tile_threshold,
+            'target_bytes': self.target_bytes,
+            'target_psnr': self.target_psnr,
+            'min_quality': self.min_quality,
+            'max_encode_attempts': self.max_encode_attempts,
+            'target_throughput': self.target_throughput,
+            'batch_deadline': self.batch_deadline,
+        }
+        return hashlib.sha256(json.dumps(settings, sort_keys=True, default=str).encode()).hexdigest()
+    
+    def _hash_file(self, path: Path) -> str:
+        """SHA-256 of a file's contents"""
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+    
+    def _run_jobs(
+        self,
+        jobs: list,
+        progress_callback: Optional[Callable[[str, int, int], None]] = None,
+        index: SourceIndex = None,
+        output_root: Path = None,
+        deadline: float = None
+    ) -> Iterator["ConversionResult"]:
+        """
+        Convert collected image jobs, fanning out to a process pool when workers > 1
+        
+        Jobs are started in job_order. With a memory_budget, jobs are only admitted while the estimated peak memory of
+        all running jobs stays within the budget; a job larger than the budget runs alone. With a deadline, jobs
+        started after the projected finish slips past it run at reduced encoder settings.
+        
+        Args:
+            jobs: List of ConversionJob
+            progress_callback: Progress callback function
+            index: Source index to record converted images in (incremental runs)
+            output_root: Root output directory (for index records)
+            deadline: time.monotonic() value to finish by (None = no time budget)
+            
+        Yields:
+            ConversionResult of each job as it finishes
+        """
+        workers = min(self.workers, len(jobs))
+        
+        # Headers are only read when an estimate needs them (or the uniform size analysis already
+        # cached them); largest-first ordering alone goes by file size
+        headers_cached = bool(self.uniform_size and self.target_width)
+        if deadline is not None or (workers > 1 and (self.memory_budget or (headers_cached and self.job_order == 'largest_first'))):
+            jobs = self._probe_jobs(jobs)
+        elif workers > 1 and self.job_order == 'largest_first':
+            jobs = self._size_jobs(jobs)
+        budget = TimeBudget(deadline, self._degradation_steps(), sum(job.cost for job in jobs)) if deadline is not None else None
+        
+        if workers <= 1 and self.pipeline:
+            yield from self._run_pipeline(jobs, progress_callback, index, output_root, budget)
+            return
+        
+        if workers <= 1:
+            for job in jobs:
+                if self.should_stop:
+                    return
+                job = self._apply_time_budget(job, budget)
+                start = time.perf_counter()
+                try:
+                    result = self._encode_image(job.source, job.output_dir, max_method=job.method, max_quality=job.quality)
+                except Exception as e:
+                    record = self._fail_job(job, e, progress_callback)
+                else:
+                    result = result._replace(seconds=time.perf_counter() - start)
+                    record = self._finish_job(job, result, progress_callback, index, output_root)
+                if budget is not None:
+                    budget.job_done(job.cost)
+                yield record
+            return
+        
+        if self.job_order == 'largest_first':
+            # Longest processing time first: a huge image found last would otherwise run alone at the end
+            jobs = sorted(jobs, key=lambda job: job.cost, reverse=True)
+        
+        if self.memory_budget:
+            # Only running jobs may hold memory, so never queue work inside the pool
+            max_in_flight = workers
+        else:
+            # Keep a bounded number of jobs in flight so stop requests take effect quickly
+            max_in_flight = workers * 2
+        
+        pending = deque(jobs)
+        in_flight = {}
+        reserved_memory = 0
+        head_skipped = False
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(self,)) as executor:
+            while True:
+                while not self.should_stop and pending and len(in_flight) < max_in_flight:
+                    head = pending[0]
+                    job = self._next_admissible_job(pending, reserved_memory, bool(in_flight), head_skipped)
+                    if job is None:
+                        break
+                    head_skipped = job is not head
+                    reserved_memory += job.memory
+                    job = self._apply_time_budget(job, budget)
+                    in_flight[executor.submit(_convert_in_worker, job.source, job.output_dir, job.method, job.quality)] = job
+                
+                if not in_flight:
+                    break
+                
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    job = in_flight.pop(future)
+                    reserved_memory -= job.memory
+                    error = future.exception()
+                    if error is None:
+                        record = self._finish_job(job, future.result(), progress_callback, index, output_root)
+                    else:
+                        record = self._fail_job(job, error, progress_callback)
+                    if budget is not None:
+                        budget.job_done(job.cost)
+                    yield record
+    
+    def _run_pipeline(
+        self,
+        jobs: list,
+        progress_callback: Optional[Callable[[str, int, int], None]] = None,
+        index: SourceIndex = None,
+        output_root: Path = None,
+        budget: "TimeBudget" = None
+    ) -> Iterator["ConversionResult"]:
+        """
+        Convert jobs on this thread, overlapping file reads and writes on helper threads
+        
+        A reader thread prefetches up to prefetch_depth source files into memory while the current image
+        is decoded and processed here, and a writer thread flushes encoded files behind it (at most
+        prefetch_depth images waiting). Jobs are recorded once their files are written.
+        
+        Args:
+            jobs: List of ConversionJob
+            progress_callback: Progress callback function
+            index: Source index to record converted images in (incremental runs)
+            output_root: Root output directory (for index records)
+            budget: Time budget of the run, if any
+            
+        Yields:
+            ConversionResult of each job once its files are written
+        """
+        prefetched = queue.Queue(maxsize=self.prefetch_depth)
+        abandoned = threading.Event()  # Set when the consumer stops iterating early
+        
+        def read_ahead() -> None:
+            for job in jobs:
+                if self.should_stop or abandoned.is_set():
+                    break
+                try:
+                    data = self._read_source(job.source)
+                except Exception as e:
+                    data = e
+                prefetched.put((job, data))
+            prefetched.put(None)
+        
+        writing = deque()  # (job, result, future) in conversion order
+        
+        def finish_oldest() -> ConversionResult:
+            job, result, written = writing.popleft()
+            error = written.exception()
+            if error is None:
+                if result.cache_key is not None:
+                    self._get_output_cache().store(result.cache_key, self._output_paths(job.source, job.output_dir))
+                record = self._finish_job(job, result, progress_callback, index, output_root)
+            else:
+                record = self._fail_job(job, error, progress_callback)
+            if budget is not None:
+                budget.job_done(job.cost)
+            return record
+        
+        reader = threading.Thread(target=read_ahead, daemon=True)
+        reader.start()
+        item = ()
+        try:
+            with ThreadPoolExecutor(max_workers=1) as writer:
+                while True:
+                    item = prefetched.get()
+                    if item is None:
+                        break
+                    if self.should_stop:
+                        # Keep draining so the reader is never left blocked on a full queue
+                        continue
+                    
+                    job, data = item
+                    job = self._apply_time_budget(job, budget)
+                    writes = []
+                    start = time.perf_counter()
+                    try:
+                        if isinstance(data, Exception):
+                            raise data
+                        result = self._encode_image(
+                            job.source, job.output_dir, max_method=job.method, max_quality=job.quality,
+                            source_data=data, writes=writes
+                        )
+                    except Exception as e:
+                        if budget is not None:
+                            budget.job_done(job.cost)
+                        yield self._fail_job(job, e, progress_callback)
+                    else:
+                        result = result._replace(seconds=time.perf_counter() - start)
+                        writing.append((job, result, writer.submit(self._write_outputs, writes)))
+                    
+                    while writing and (len(writing) > self.prefetch_depth or writing[0][2].done()):
+                        yield finish_oldest()
+                
+                while writing:
+                    yield finish_oldest()
+        finally:
+            abandoned.set()
+            while item is not None:
+                item = prefetched.get()
+            reader.join()
+    
+    def _read_source(self, path: Path) -> bytes:
+        """Read a whole source file into memory, hinting sequential access where the OS supports it"""
+        with open(path, 'rb') as f:
+            if hasattr(os, 'posix_fadvise'):
+                os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+            return f.read()
+    
+    def _write_outputs(self, writes: list) -> None:
+        """Write encoded files collected in pipeline mode"""
+        for output_path, data in writes:
+            self._write_output(output_path, data)
+    
+    def _degradation_steps(self) -> list:
+        """(method, quality) settings a time budget may step down through, starting at the configured ones"""
+        steps = [(self.method, self.quality)]
+        for method in self.TIME_BUDGET_METHODS:
+            if method < steps[-1][0]:
+                steps.append((method, self.quality))
+        if not self.lossless:
+            for drop in self.TIME_BUDGET_QUALITY_DROPS:
+                quality = max(self.min_quality, self.quality - drop)
+                if quality < steps[-1][1]:
+                    steps.append((steps[-1][0], quality))
+        return steps
+    
+    def _apply_time_budget(self, job: ConversionJob, budget: Optional[TimeBudget]) -> ConversionJob:
+        """Cap a job's encoder settings at the current time budget step"""
+        if budget is None or not budget.degraded:
+            return job
+        method, quality = budget.settings
+        return job._replace(method=method, quality=quality)
+    
+    def _finish_job(
+        self,
+        job: ConversionJob,
+        result: EncodeResult,
+        progress_callback: Optional[Callable[[str, int, int], None]] = None,
+        index: SourceIndex = None,
+        output_root: Path = None
+    ) -> "ConversionResult":
+        """Record a successfully converted job (and its outputs in the source index)"""
+        degraded = job.method is not None or job.quality is not None
+        if degraded:
+            self.degraded_files[str(job.source)] = (job.method, job.quality)
+        
+        if index is not None and job.entry is not None:
+            relative_path = self._relative_source_path(job.entry)
+            outputs = [Path(output).relative_to(output_root).as_posix() for output in result.outputs]
+            
+            # Remove outputs of the previous conversion that are no longer produced
+            record = index.get(relative_path)
+            if record is not None:
+                for stale in set(record[4]) - set(outputs):
+                    try:
+                        (output_root / stale).unlink()
+                    except FileNotFoundError:
+                        pass
+            
+            # Outputs made at reduced settings never match the fingerprint, so the next run redoes them
+            fingerprint = self._settings_fingerprint()
+            if degraded:
+                fingerprint = f"{fingerprint}:degraded"
+            index.update(
+                relative_path,
+                job.entry.size,
+                job.entry.mtime,
+                result.content_hash,
+                fingerprint,
+                outputs
+            )
+        
+        self._record_success(job.source, progress_callback, result.method, degraded)
+        return self._conversion_result(job.source, job.entry, result.outputs, 'converted', result.seconds)
+    
+    def _fail_job(
+        self,
+        job: ConversionJob,
+        error: Exception,
+        progress_callback: Optional[Callable[[str, int, int], None]] = None
+    ) -> "ConversionResult":
+        """Record a failed job"""
+        self._record_error(job.source, error, progress_callback)
+        return self._conversion_result(job.source, job.entry, [], 'failed', error=error)
+    
+    def _conversion_result(
+        self,
+        source: Path,
+        entry: Optional[ScanEntry],
+        outputs: list,
+        status: str,
+        seconds: float = None,
+        error: Exception = None
+    ) -> "ConversionResult":
+        """Build the result record of a source file, measuring input and output sizes"""
+        if entry is not None and entry.size is not None:
+            bytes_in = entry.size
+        else:
+            try:
+                bytes_in = os.stat(source).st_size
+            except OSError:
+                bytes_in = 0
+        
+        bytes_out = 0
+        for output in outputs:
+            try:
+                bytes_out += os.lstat(output).st_size
+            except OSError:
+                pass
+        
+        return ConversionResult(source, [Path(output) for output in outputs], bytes_in, bytes_out, seconds, status, error)
+    
+    def _next_admissible_job(self, pending: deque, reserved_memory: int, running: bool, head_skipped: bool = False) -> Optional[ConversionJob]:
+        """
+        Take the first pending job that fits into the memory budget
+        
+        A job past the head may start in place of a head job that does not fit, but only once:
+        after that the head waits for running jobs to free room, so large jobs are not starved.
+        
+        Args:
+            pending: Queue of jobs not yet started
+            reserved_memory: Estimated memory of the running jobs
+            running: Whether any job is running
+            head_skipped: Whether a later job already started in place of the current head job
+            
+        Returns:
+            Job to start now, or None if nothing fits until a running job finishes
+        """
+        if not self.memory_budget:
+            return pending.popleft()
+        
+        lookahead = 1 if head_skipped else self.ADMISSION_LOOKAHEAD
+        for index in range(min(len(pending), lookahead)):
+            job = pending[index]
+            if not running or reserved_memory + job.memory <= self.memory_budget:
+                del pending[index]
+                return job
+        return None
+    
+    def _probe_jobs(self, jobs: list) -> list:
+        """Read image headers for jobs and attach header info, memory and cost estimates"""
+        headers = iter(self._probe_headers([job.entry for job in jobs if job.entry is not None]))
+        probed = []
+        for job in jobs:
+            header = next(headers) if job.entry is not None else self._probe_image(job.source)
+            probed.append(job._replace(
+                header=header,
+                memory=self._estimate_job_memory(header),
+                cost=self._estimate_job_cost(header)
+            ))
+        return probed
+    
+    def _size_jobs(self, jobs: list) -> list:
+        """Use the source file size as the cost of jobs, stat'ing files the scan did not stat"""
+        sized = []
+        for job in jobs:
+            size = job.entry.size if job.entry is not None else None
+            if size is None:
+                try:
+                    size = os.stat(job.source).st_size
+                except OSError:
+                    size = 0
+            sized.append(job._replace(cost=float(size)))
+        return sized
+    
+    def _probe_headers(self, entries: list) -> list:
+        """
+        Read (width, height, mode) of many images, reusing headers cached for unchanged files
+        
+        Headers are looked up by (path, size, mtime) in this process and in the metadata cache;
+        the rest are read on a thread pool and added to both caches. Entries the scan did not
+        stat are stat'ed here for their cache key.
+        
+        Args:
+            entries: ScanEntry of each image
+            
+        Returns:
+            List of (width, height, mode) or None (unreadable), in the order of entries
+        """
+        cache = self._get_metadata_cache()
+        keys = [self._header_key(entry) for entry in entries]
+        headers = [None] * len(entries)
+        missing = []
+        for position, key in enumerate(keys):
+            header = self._header_cache.get(key)
+            if header is None and cache is not None and key[2] is not None:
+                header = cache.get_header(*key)
+            if header is None:
+                missing.append(position)
+            else:
+                headers[position] = self._header_cache[key] = header
+        
+        if missing:
+            new_rows = []
+            with ThreadPoolExecutor(max_workers=self.PROBE_THREADS) as executor:
+                probed = executor.map(self._probe_image, [entries[position].path for position in missing])
+                for position, header in zip(missing, probed):
+                    headers[position] = header
+                    if header is not None:
+                        key = keys[position]
+                        self._header_cache[key] = header
+                        if key[2] is not None:
+                            new_rows.append(key + header)
+            if cache is not None and new_rows:
+                cache.store_headers(new_rows)
+        
+        return headers
+    
+    def _header_key(self, entry: ScanEntry) -> tuple:
+        """Header cache key (absolute path, size, mtime) of an entry, stat'ing it if the scan did not"""
+        path = os.path.abspath(entry.path)
+        if entry.mtime is not None:
+            return path, entry.size, entry.mtime
+        try:
+            stat = os.stat(path)
+        except OSError:
+            # Unreadable anyway; cached by path for this run only
+            return path, None, None
+        return path, stat.st_size, stat.st_mtime
+    
+    def _get_metadata_cache(self) -> Optional["MetadataCache"]:
+        """Header database (opened on first use), or None if it cannot be opened"""
+        if self._metadata_cache is None:
+            path = Path(self.metadata_cache) if self.metadata_cache else _default_metadata_cache_path()
+            try:
+                self._metadata_cache = MetadataCache(path)
+            except (OSError, sqlite3.Error):
+                self._metadata_cache = False
+        return self._metadata_cache or None
+    
+    def _probe_image(self, image_path: Path) -> Optional[tuple]:
+        """
+        Read image dimensions and mode from the file header without decoding pixels
+        
+        Args:
+            image_path: Path to source image
+            
+        Returns:
+            Tuple of (width, height, mode), or None if the file cannot be read
+        """
+        try:
+            with Image.open(image_path) as img:
+                return img.width, img.height, img.mode
+        except Exception:
+            return None
+    
+    def _output_pixels(self, width: int, height: int) -> int:
+        """Pixel count of the converted image for a source of the given size"""
+        if self.target_width and self.target_width > 0:
+            if self.uniform_size and self.uniform_dimensions:
+                return self.uniform_dimensions[0] * self.uniform_dimensions[1]
+            return self.target_width * int(self.target_width * height / width)
+        return width * height
+    
+    def _estimate_job_cost(self, header: Optional[tuple]) -> float:
+        """
+        Estimate the relative CPU cost of converting an image with the current settings
+        
+        Args:
+            header: (width, height, mode) from _probe_image, or None
+            
+        Returns:
+            Pixel count weighted by STAGE_COST_WEIGHTS (0 if unknown)
+        """
+        if header is None:
+            return 0.0
+        
+        width, height, _ = header
+        weights = self.STAGE_COST_WEIGHTS
+        output_pixels = self._output_pixels(width, height)
+        
+        encode_weight = weights['encode']
+        if self.create_bw:
+            encode_weight += weights['bw']
+        
+        fine_tuning_weight = 0.0
+        if self.fine_tuning:
+            fine_tuning_weight = weights['auto_tone' if self.fine_tuning.get('auto_tone', False) else 'fine_tuning']
+        
+        return (
+            width * height * weights['decode']
+            + output_pixels * fine_tuning_weight
+            + output_pixels * self._pyramid_pixel_factor() * encode_weight
+        )
+    
+    def _pyramid_pixel_factor(self) -> float:
+        """Encoded pixels relative to the largest output (above 1 in responsive mode)"""
+        if not self.target_widths:
+            return 1.0
+        largest = self.target_widths[0]
+        return sum((width / largest) ** 2 for width in self.target_widths)
+    
+    def _estimate_job_memory(self, header: Optional[tuple]) -> int:
+        """
+        Estimate the peak memory of converting an image with the current settings
+        
+        Args:
+            header: (width, height, mode) from _probe_image, or None
+            
+        Returns:
+            Estimated peak memory in bytes (0 if unknown)
+        """
+        if header is None:
+            return 0
+        
+        width, height, mode = header
+        # Pillow stores single-band 8-bit images in 1 byte per pixel, everything else in 4
+        source_bytes = width * height * (1 if mode in ('1', 'L', 'P') else 4)
+        
+        output_pixels = self._output_pixels(width, height)
+        
+        # Decoded source + converted/resized copy + encoder state
+        memory = source_bytes + output_pixels * (4 + self.ENCODER_BYTES_PER_PIXEL)
+        
+        if self.fine_tuning:
+            if output_pixels > (self.tile_threshold or float('inf')):
+                memory += self.tile_memory_budget
+            elif self.fine_tuning.get('auto_tone', False) or self._use_fine_tuning_lut():
+                memory += output_pixels * 4  # One LUT pass into a new image
+            else:
+                memory += output_pixels * 40  # Stage-by-stage copies and float buffers
+        
+        if self.create_bw:
+            memory += output_pixels * 4
+        
+        # Smaller responsive levels are held while they are encoded
+        memory += int(output_pixels * (self._pyramid_pixel_factor() - 1) * 4)
+        
+        return memory
+    
+    def _convert_image(
+        self, 
+        image_path: Path, 
+        output_dir: Path,
+        progress_callback: Optional[Callable[[str, int, int], None]] = None,
+        custom_output_path: Path = None
+    ) -> None:
+        """
+        Convert a single image to WebP and record the result
+        
+        Args:
+            image_path: Path to source image
+            output_dir: Output directory
+            progress_callback: Progress callback function
+            custom_output_path: Custom output path (for single file conversion with versioning)
+        """
+        try:
+            result = self._encode_image(image_path, output_dir, custom_output_path)
+        except Exception as e:
+            self._record_error(image_path, e, progress_callback)
+        else:
+            self._record_success(image_path, progress_callback, result.method)
+    
+    def _record_success(
+        self,
+        image_path: Path,
+        progress_callback: Optional[Callable[[str, int, int], None]] = None,
+        method: int = None,
+        degraded: bool = False
+    ) -> None:
+        """Count a converted image, record its encoder method and report progress"""
+        self.processed_files += 1
+        if method is not None:
+            self.method_report[str(image_path)] = method
+        
+        if progress_callback:
+            if self.target_widths:
+                resize_info = f" (widths {', '.join(str(width) for width in self.target_widths)}px)"
+            else:
+                resize_info = f" (resized to {self.target_width}px width)" if self.target_width else ""
+            bw_info = " + B&W version" if self.create_bw else ""
+            method_info = f" [method {method}]" if method is not None and self._adaptive_method() else ""
+            degraded_info = " [reduced settings for time budget]" if degraded else ""
+            progress_callback(
+                f"Converted: {image_path.name}{resize_info}{bw_info}{method_info}{degraded_info}", 
+                self.processed_files, 
+                self.total_files
+            )
+    
+    def _record_error(
+        self,
+        image_path: Path,
+        error: Exception,
+        progress_callback: Optional[Callable[[str, int, int], None]] = None
+    ) -> None:
+        """Record a failed conversion and report progress"""
+        error_msg = f"Error converting {image_path.name}: {str(error)}"
+        self.errors.append(error_msg)
+        if progress_callback:
+            progress_callback(error_msg, self.processed_files, self.total_files)
+    
+    def _encode_image(
+        self,
+        image_path: Path,
+        output_dir: Path,
+        custom_output_path: Path = None,
+        max_method: int = None,
+        max_quality: int = None,
+        source_data: bytes = None,
+        writes: list = None
+    ) -> EncodeResult:
+        """
+        Convert a single image to WebP, raising on failure
+        
+        Args:
+            image_path: Path to source image
+            output_dir: Output directory
+            custom_output_path: Custom output path (for single file conversion with versioning)
+            max_method: Cap on the WebP method (time budget fallback)
+            max_quality: Cap on the quality (time budget fallback)
+            source_data: Contents of the source file, already read into memory (pipeline mode)
+            writes: Collects (path, data) of encoded files instead of writing them (pipeline mode);
+                the result then carries the output cache entry to store once they are written
+            
+        Returns:
+            EncodeResult with the written files
+        """
+        # Incremental runs record the source hash to recognise touched-but-unchanged files,
+        # and the output cache and adaptive quality cache are keyed by it
+        content_hash = None
+        if self.incremental or self.cache_dir is not None or self._is_adaptive():
+            if source_data is not None:
+                content_hash = hashlib.sha256(source_data).hexdigest()
+            else:
+                content_hash = self._hash_file(image_path)
+        
+        output_paths = self._output_paths(image_path, output_dir, custom_output_path)
+        
+        # Identical source pixels with identical settings: reuse the previously encoded files
+        cache = self._get_output_cache()
+        if cache is not None:
+            cache_key = hashlib.sha256(f"{content_hash}:{self._settings_fingerprint()}".encode()).hexdigest()
+            cached = cache.lookup(cache_key)
+            if cached is not None and cached.keys() == output_paths.keys():
+                for variant, output_path in output_paths.items():
+                    _link_or_copy(cached[variant], output_path)
+                return EncodeResult(list(output_paths.values()), content_hash)
+        
+        # Open and convert image
+        with self._open_source(image_path, source_data) as img:
+            # Resize if target width is specified
+            if self.target_width and self.target_width > 0:
+                original_width, original_height = img.size
+                
+                # Uniform size mode: crop all images to same dimensions
+                if self.uniform_size and self.uniform_dimensions:
+                    target_w, target_h = self.uniform_dimensions
+                    cover_size = self._cover_size(original_width, original_height, target_w, target_h)
+                    source_box = self._draft(img, cover_size)
+                    img = self._crop_to_uniform_size(img, target_w, target_h, source_box)
+                
+                elif original_width != self.target_width:
+                    # Calculate proportional height
+                    aspect_ratio = original_height / original_width
+                    new_height = int(self.target_width * aspect_ratio)
+                    source_box = self._draft(img, (self.target_width, new_height)) or (0, 0) + img.size
+                    output_size = (self.target_width, new_height)
+                    
+                    # Make horizontal: crop vertical images to landscape format
+                    if self.make_horizontal and new_height > self.target_width:
+                        # Image is vertical (height > width), crop to square from center
+                        # Only the source rows that survive the crop are resampled
+                        output_size = (self.target_width, self.target_width)
+                        source_box = self._center_crop_box(source_box, (self.target_width, new_height), output_size)
+                    
+                    img = self._resize(img, output_size, source_box)
+            
+            # Convert RGBA to RGB if necessary
+            if img.mode in ('RGBA', 'LA') or (img.mode == 'P' and 'transparency' in img.info):
+                if self.preserve_alpha:
+                    # Keep alpha channel - convert to RGBA
+                    if img.mode == 'P':
+                        img = img.convert('RGBA')
+                    elif img.mode == 'LA':
+                        img = img.convert('RGBA')
+                    # RGBA stays as is
+                else:
+                    # Remove alpha channel - convert to RGB with white background
+                    if img.mode in ('RGBA', 'LA'):
+                        img = self._process_in_strips(img, self._flatten_alpha, mode='RGB', bytes_per_pixel=12)
+                    elif img.mode == 'P':
+                        img = img.convert('RGB')
+            elif img.mode not in ('RGB', 'RGBA'):
+                img = img.convert('RGB')
+            
+            # Apply fine-tuning adjustments if enabled
+            if self.fine_tuning:
+                img = self._apply_fine_tuning(img)
+            
+            # Choose encoder settings from the final size of the image
+            encoded_pixels = img.width * img.height * self._pyramid_pixel_factor() * (2 if self.create_bw else 1)
+            method = self._choose_method(encoded_pixels)
+            if max_method is not None:
+                method = min(method, max_method)
+            quality = self.quality if max_quality is None else min(self.quality, max_quality)
+            quality_key = None
+            if self._is_adaptive():
+                quality_key = f"{content_hash}:{self._settings_fingerprint()}:m{method}:q{quality}"
+            encoding = EncoderSettings(quality, method, quality_key, writes)
+            
+            if self.target_widths:
+                # Downscale pyramid: each width is resampled from the previous, larger level
+                base_width, base_height = img.size
+                level = img
+                for width in self.target_widths:
+                    if level.width != width:
+                        level = self._resize(level, (width, max(1, int(width * base_height / base_width))))
+                    self._save_versions(
+                        level, output_paths[f'{width}w'], output_paths.get(f'{width}w_bw'),
+                        encoding._replace(quality_key=quality_key and f"{quality_key}:{width}w")
+                    )
+            else:
+                self._save_versions(
+                    img, output_paths['color'], output_paths.get('bw'),
+                    encoding._replace(quality_key=quality_key and f"{quality_key}:color")
+                )
+        
+        # Outputs made at reduced settings must not stand in for the configured ones
+        if cache is not None and max_method is None and max_quality is None:
+            if writes is not None:
+                # Not written yet: the caller stores the entry after flushing the writes
+                return EncodeResult(list(output_paths.values()), content_hash, method, cache_key)
+            cache.store(cache_key, output_paths)
+        
+        return EncodeResult(list(output_paths.values()), content_hash, method)
+    
+    def _open_source(self, image_path: Path, source_data: bytes = None) -> Image.Image:
+        """Open a source image from its path, or from its contents already read into memory"""
+        if source_data is None:
+            return Image.open(image_path)
+        try:
+            return Image.open(io.BytesIO(source_data))
+        except Image.UnidentifiedImageError:
+            # Name the file rather than the in-memory buffer
+            raise Image.UnidentifiedImageError(f"cannot identify image file '{image_path}'") from None
+    
+    def _save_versions(self, img: Image.Image, output_path: Path, bw_output_path: Path = None, encoding: EncoderSettings = None) -> None:
+        """
+        Save the color version of a processed image, and its black & white version if requested
+        
+        Args:
+            img: Processed PIL Image object
+            output_path: Path of the color version
+            bw_output_path: Path of the B&W version (None = no B&W version)
+            encoding: Encoder settings of the color version (None = converter settings);
+                the B&W adaptive quality cache key is derived from it
+        """
+        bw_encoding = encoding
+        if encoding is not None and encoding.quality_key is not None and bw_output_path is not None:
+            bw_encoding = encoding._replace(quality_key=f"{encoding.quality_key}_bw")
+        
+        # The output cache connection belongs to this thread: adaptive qualities are read before
+        # encoding and persisted after, so the helper thread only touches the in-process cache
+        quality_keys = [
+            settings.quality_key for settings in (encoding, bw_encoding)
+            if settings is not None and settings.quality_key is not None
+        ]
+        self._load_qualities(quality_keys)
+        
+        if bw_output_path is None:
+            # Save color version as WebP
+            self._save_webp(img, output_path, encoding)
+            self._store_qualities(quality_keys)
+            return
+        
+        # Both versions come from the same processed buffer. Pillow releases the GIL
+        # while encoding, so the color version is encoded on a helper thread while the
+        # grayscale version is derived and encoded here.
+        img.load()
+        color_saved = self._get_encoder_thread().submit(self._save_webp, img, output_path, encoding)
+        try:
+            # Convert to grayscale
+            bw_mode = 'RGBA' if img.mode == 'RGBA' else 'L'
+            bw_img = self._process_in_strips(img, self._to_grayscale, mode=bw_mode, bytes_per_pixel=12)
+            
+            # Save B&W version with same settings
+            self._save_webp(bw_img, bw_output_path, bw_encoding)
+        finally:
+            # The color encode reads img: never return (or raise) while it is still running
+            wait([color_saved])
+        color_saved.result()
+        self._store_qualities(quality_keys)
+    
+    def _get_encoder_thread(self) -> ThreadPoolExecutor:
+        """Helper encoder thread of this process (started on first use, reused for the run)"""
+        if self._encoder_thread is None:
+            self._encoder_thread = ThreadPoolExecutor(max_workers=1)
+        return self._encoder_thread
+    
+    def _close_encoder_thread(self) -> None:
+        """Stop the helper encoder thread at the end of a run"""
+        if self._encoder_thread is not None:
+            self._encoder_thread.shutdown()
+            self._encoder_thread = None
+    
+    def _output_paths(self, image_path: Path, output_dir: Path, custom_output_path: Path = None) -> dict:
+        """
+        Output file paths of an image conversion
+        
+        Args:
+            image_path: Path to source image
+            output_dir: Output directory
+            custom_output_path: Custom output path (for single file conversion with versioning)
+            
+        Returns:
+            Dictionary of variant name ('color', 'bw', or '<width>w' and '<width>w_bw'
+            in responsive mode) -> output path
+        """
+        if self.target_widths:
+            # Responsive variants: name_<width>w.webp and name_<width>w_bw.webp
+            base_name = custom_output_path.stem if custom_output_path else image_path.stem
+            output_paths = {}
+            for width in self.target_widths:
+                output_paths[f'{width}w'] = output_dir / f"{base_name}_{width}w.webp"
+                if self.create_bw:
+                    output_paths[f'{width}w_bw'] = output_dir / f"{base_name}_{width}w_bw.webp"
+            return output_paths
+        
+        # Create output path with .webp extension
+        if custom_output_path:
+            output_path = custom_output_path
+        else:
+            output_path = output_dir / f"{image_path.stem}.webp"
+        output_paths = {'color': output_path}
+        
+        if self.create_bw:
+            # Use custom output path for B&W version if provided
+            if custom_output_path:
+                # Get version suffix from custom output path if exists
+                if '_WebP_' in custom_output_path.stem:
+                    # Extract version number (e.g., image_WebP_2 -> _bw_WebP_2)
+                    base_name = image_path.stem
+                    version_suffix = custom_output_path.stem.replace(base_name, '')
+                    bw_output_path = output_dir / f"{base_name}_bw{version_suffix}.webp"
+                else:
+                    bw_output_path = output_dir / f"{image_path.stem}_bw.webp"
+            else:
+                bw_output_path = output_dir / f"{image_path.stem}_bw.webp"
+            output_paths['bw'] = bw_output_path
+        
+        return output_paths
+    
+    def _save_webp(self, img: Image.Image, output_path: Path, encoding: EncoderSettings = None) -> None:
+        """
+        Encode an image as WebP with the converter settings
+        
+        Args:
+            img: Image to encode
+            output_path: Destination file
+            encoding: Encoder settings chosen for this image (None = converter settings)
+        """
+        if encoding is None:
+            encoding = EncoderSettings(self.quality, self.method)
+        
+        if self._is_adaptive():
+            data = self._encode_adaptive(img, encoding)
+        else:
+            data = self._encode_webp(img, encoding.quality, encoding.method)
+        
+        if encoding.writes is not None:
+            encoding.writes.append((output_path, data))
+        else:
+            self._write_output(output_path, data)
+    
+    def _write_output(self, output_path: Path, data: bytes) -> None:
+        """Write an encoded file"""
+        # Replace instead of overwriting in place: the old file may be a hardlink into the output cache
+        output_path.unlink(missing_ok=True)
+        output_path.write_bytes(data)
+    
+    def _encode_webp(self, img: Image.Image, quality: int, method: int) -> bytes:
+        """Encode an image as WebP in memory"""
+        buffer = io.BytesIO()
+        start = time.perf_counter()
+        img.save(
+            buffer,
+            'WEBP',
+            quality=quality,
+            lossless=self.lossless,
+            method=method
+        )
+        self._record_encode_rate(img.width * img.height, method, time.perf_counter() - start)
+        return buffer.getvalue()
+    
+    def _adaptive_method(self) -> bool:
+        """Whether the WebP method is chosen per image to meet target_throughput or batch_deadline"""
+        return self.target_throughput is not None or self.batch_deadline is not None
+    
+    def _plan_method_allowance(self, image_count: int, workers: int) -> None:
+        """
+        Derive the encode time each image may take from the throughput target and batch deadline
+        
+        Args:
+            image_count: Number of images about to be converted
+            workers: Number of images converted at the same time
+        """
+        allowances = []
+        if self.target_throughput:
+            allowances.append(max(1, workers) / self.target_throughput)
+        if self.batch_deadline and image_count:
+            allowances.append(self.batch_deadline * max(1, workers) / image_count)
+        self._method_time_allowance = min(allowances) if allowances else None
+    
+    def _choose_method(self, encoded_pixels: float) -> int:
+        """
+        Pick the WebP method for an image
+        
+        With a throughput target this is the slowest (best compressing) method up to `method` whose
+        estimated encode time fits the per-image allowance, falling back to method 0.
         
-        return str(output_file), self.total_files, self.processed_files, self.errors
+        Args:
+            encoded_pixels: Total pixels of all outputs of the image
+            
+        Returns:
+            WebP method (0-6)
+        """
+        if self.lossless or not self._adaptive_method() or self._method_time_allowance is None:
+            return self.method
+        
+        for method in range(self.method, -1, -1):
+            if encoded_pixels * self._encode_rate * self.METHOD_COST_FACTORS[method] <= self._method_time_allowance:
+                return method
+        return 0
     
-    def _count_images(self, directory: Path) -> None:
-        """Count total number of images to process"""
-        for item in directory.rglob('*'):
-            if item.is_file() and item.suffix.lower() in self.SUPPORTED_FORMATS:
-                self.total_files += 1
+    def _record_encode_rate(self, pixels: int, method: int, seconds: float) -> None:
+        """Refine the method 4 encode rate estimate from a measured lossy encode"""
+        if self.lossless or pixels <= 0:
+            return
+        rate = seconds / (pixels * self.METHOD_COST_FACTORS.get(method, 1.0))
+        with self._encode_rate_lock:
+            self._encode_rate += 0.3 * (rate - self._encode_rate)
     
-    def _process_directory(
-        self, 
-        source_dir: Path, 
-        output_dir: Path, 
-        root_source: Path,
-        progress_callback: Optional[Callable[[str, int, int], None]] = None
-    ) -> None:
+    def _is_adaptive(self) -> bool:
+        """Whether quality is searched per image to meet target_bytes or target_psnr"""
+        return self.target_bytes is not None or self.target_psnr is not None
+    
+    def _encode_adaptive(self, img: Image.Image, encoding: EncoderSettings) -> bytes:
         """
-        Recursively process directory and maintain structure
+        Encode an image at the quality meeting the adaptive target, reusing a previously chosen quality
         
         Args:
-            source_dir: Current source directory
-            output_dir: Current output directory
-            root_source: Root source directory for relative path calculation
-            progress_callback: Progress callback function
+            img: Image to encode
+            encoding: Encoder settings; quality is the upper bound of the search, and quality_key
+                (source hash + settings fingerprint + variant) caches the result in this process
+                (None = no caching); _save_versions loads and persists it with the output cache
+            
+        Returns:
+            Encoded WebP data
         """
-        for item in source_dir.iterdir():
-            # Check if stop requested
-            if self.should_stop:
-                return
-                
-            if item.is_file():
-                # Check if it's a supported image format
-                if item.suffix.lower() in self.SUPPORTED_FORMATS:
-                    self._convert_image(item, output_dir, progress_callback)
-                else:
-                    # Copy non-image files as-is
-                    try:
-                        shutil.copy2(item, output_dir / item.name)
-                    except Exception as e:
-                        self.errors.append(f"Error copying {item.name}: {str(e)}")
-                        
-            elif item.is_dir():
-                # Create corresponding subdirectory (without _WebP suffix)
-                new_output_dir = output_dir / item.name
-                new_output_dir.mkdir(exist_ok=True)
-                
-                # Recursively process subdirectory
-                self._process_directory(item, new_output_dir, root_source, progress_callback)
+        quality_key = encoding.quality_key
+        quality = self._quality_cache.get(quality_key) if quality_key is not None else None
+        if quality is not None:
+            return self._encode_webp(img, quality, encoding.method)
+        
+        quality, data = self._search_quality(img, encoding)
+        if quality_key is not None:
+            self._quality_cache[quality_key] = quality
+        return data
     
-    def _convert_image(
-        self, 
-        image_path: Path, 
-        output_dir: Path,
-        progress_callback: Optional[Callable[[str, int, int], None]] = None,
-        custom_output_path: Path = None
-    ) -> None:
+    def _load_qualities(self, quality_keys: list) -> None:
+        """Copy adaptive qualities persisted in the output cache into the in-process cache"""
+        cache = self._get_output_cache()
+        if cache is None:
+            return
+        for quality_key in quality_keys:
+            if quality_key not in self._quality_cache:
+                quality = cache.get_quality(quality_key)
+                if quality is not None:
+                    self._quality_cache[quality_key] = quality
+    
+    def _store_qualities(self, quality_keys: list) -> None:
+        """Persist adaptive qualities chosen for these keys in the output cache"""
+        cache = self._get_output_cache()
+        if cache is None:
+            return
+        for quality_key in quality_keys:
+            if quality_key in self._quality_cache:
+                cache.set_quality(quality_key, self._quality_cache[quality_key])
+    
+    def _search_quality(self, img: Image.Image, encoding: EncoderSettings) -> tuple[int, bytes]:
         """
-        Convert a single image to WebP
+        Bisect quality between min_quality and the encoder quality for the adaptive target
+        
+        Size and PSNR both grow with quality, so a byte budget looks for the highest quality that
+        fits and a PSNR target for the lowest quality that reaches it. At most max_encode_attempts
+        encodes are made in total; if none meets the target, the tried quality closest to it is used
+        (the lowest for a byte budget, the highest for a PSNR target).
         
         Args:
-            image_path: Path to source image
-            output_dir: Output directory
-            progress_callback: Progress callback function
-            custom_output_path: Custom output path (for single file conversion with versioning)
+            img: Image to encode
+            encoding: Encoder settings (quality is the upper bound of the search)
+            
+        Returns:
+            Tuple of (chosen quality, encoded WebP data)
         """
-        try:
-            # Open and convert image
-            with Image.open(image_path) as img:
-                # Resize if target width is specified
-                if self.target_width and self.target_width > 0:
-                    original_width, original_height = img.size
-                    
-                    # Uniform size mode: crop all images to same dimensions
-                    if self.uniform_size and self.uniform_dimensions:
-                        target_w, target_h = self.uniform_dimensions
-                        img = self._crop_to_uniform_size(img, target_w, target_h)
-                    
-                    elif original_width != self.target_width:
-                        # Calculate proportional height
-                        aspect_ratio = original_height / original_width
-                        new_height = int(self.target_width * aspect_ratio)
-                        img = img.resize((self.target_width, new_height), Image.Resampling.LANCZOS)
-                        
-                        # Make horizontal: crop vertical images to landscape format
-                        if self.make_horizontal and new_height > self.target_width:
-                            # Image is vertical (height > width), crop to square/landscape
-                            # Calculate crop to make it landscape (width = height or width > height)
-                            target_height = self.target_width  # Make it square based on target width
-                            
-                            # Calculate how much to crop from top and bottom
-                            crop_total = new_height - target_height
-                            crop_top = crop_total // 2
-                            crop_bottom = crop_total - crop_top
-                            
-                            # Crop from center
-                            left = 0
-                            top = crop_top
-                            right = self.target_width
-                            bottom = new_height - crop_bottom
-                            
-                            img = img.crop((left, top, right, bottom))
-                
-                # Convert RGBA to RGB if necessary
-                if img.mode in ('RGBA', 'LA') or (img.mode == 'P' and 'transparency' in img.info):
-                    if self.preserve_alpha:
-                        # Keep alpha channel - convert to RGBA
-                        if img.mode == 'P':
-                            img = img.convert('RGBA')
-                        elif img.mode == 'LA':
-                            img = img.convert('RGBA')
-                        # RGBA stays as is
-                    else:
-                        # Remove alpha channel - convert to RGB with white background
-                        if img.mode in ('RGBA', 'LA'):
-                            background = Image.new('RGB', img.size, (255, 255, 255))
-                            if img.mode == 'RGBA':
-                                background.paste(img, mask=img.split()[-1])
-                            else:
-                                background.paste(img.convert('RGB'))
-                            img = background
-                        elif img.mode == 'P':
-                            img = img.convert('RGB')
-                elif img.mode not in ('RGB', 'RGBA'):
-                    img = img.convert('RGB')
-                
-                # Apply fine-tuning adjustments if enabled
-                if self.fine_tuning:
-                    img = self._apply_fine_tuning(img)
-                
-                # Create output path with .webp extension
-                if custom_output_path:
-                    output_path = custom_output_path
-                else:
-                    output_path = output_dir / f"{image_path.stem}.webp"
-                
-                # Save color version as WebP
-                img.save(
-                    output_path,
-                    'WEBP',
-                    quality=self.quality,
-                    lossless=self.lossless,
-                    method=self.method
-                )
-                
-                # Create black & white version if enabled
-                if self.create_bw:
-                    # Use custom output path for B&W version if provided
-                    if custom_output_path:
-                        # Get version suffix from custom output path if exists
-                        if '_WebP_' in custom_output_path.stem:
-                            # Extract version number (e.g., image_WebP_2 -> _bw_WebP_2)
-                            base_name = image_path.stem
-                            version_suffix = custom_output_path.stem.replace(base_name, '')
-                            bw_output_path = output_dir / f"{base_name}_bw{version_suffix}.webp"
-                        else:
-                            bw_output_path = output_dir / f"{image_path.stem}_bw.webp"
-                    else:
-                        bw_output_path = output_dir / f"{image_path.stem}_bw.webp"
-                    
-                    # Convert to grayscale
-                    if img.mode == 'RGBA':
-                        # Convert RGBA to LA (grayscale with alpha)
-                        bw_img = img.convert('LA').convert('RGBA')
-                    else:
-                        # Convert to grayscale (L mode)
-                        bw_img = img.convert('L')
-                    
-                    # Save B&W version with same settings
-                    bw_img.save(
-                        bw_output_path,
-                        'WEBP',
-                        quality=self.quality,
-                        lossless=self.lossless,
-                        method=self.method
-                    )
-                
-            self.processed_files += 1
+        low, high = min(self.min_quality, encoding.quality), encoding.quality
+        by_size = self.target_bytes is not None
+        encoded = {}
+        chosen = None
+        
+        # Most images already fit a byte budget at full quality, which settles them in one encode
+        candidate = high if by_size else (low + high) // 2
+        while low <= high and len(encoded) < max(1, self.max_encode_attempts):
+            data = encoded[candidate] = self._encode_webp(img, candidate, encoding.method)
+            if by_size:
+                meets = len(data) <= self.target_bytes
+            else:
+                meets = self._psnr(img, data) >= self.target_psnr
             
-            if progress_callback:
-                resize_info = f" (resized to {self.target_width}px width)" if self.target_width else ""
-                bw_info = " + B&W version" if self.create_bw else ""
-                progress_callback(
-                    f"Converted: {image_path.name}{resize_info}{bw_info}", 
-                    self.processed_files, 
-                    self.total_files
-                )
-                
-        except Exception as e:
-            error_msg = f"Error converting {image_path.name}: {str(e)}"
-            self.errors.append(error_msg)
-            if progress_callback:
-                progress_callback(error_msg, self.processed_files, self.total_files)
+            if meets:
+                chosen = candidate
+            if meets == by_size:
+                low = candidate + 1
+            else:
+                high = candidate - 1
+            candidate = (low + high) // 2
+        
+        if chosen is None:
+            # Target not met: smallest file for a byte budget, best quality for a PSNR target,
+            # among the qualities already encoded so the attempt cap holds
+            chosen = min(encoded) if by_size else max(encoded)
+        
+        return chosen, encoded[chosen]
+    
+    def _psnr(self, reference: Image.Image, data: bytes) -> float:
+        """Peak signal-to-noise ratio in dB of encoded WebP data against the image it was encoded from"""
+        with Image.open(io.BytesIO(data)) as decoded:
+            decoded = decoded.convert(reference.mode)
+        
+        # Sum squared errors over row chunks to bound working memory on large images
+        original = np.asarray(reference)
+        candidate = np.asarray(decoded)
+        row_bytes = max(1, original[0].size * 8)
+        chunk_rows = max(1, self.TONE_CHUNK_BYTES // row_bytes)
+        squared_error = 0.0
+        for top in range(0, original.shape[0], chunk_rows):
+            difference = original[top:top + chunk_rows].astype(np.float64) - candidate[top:top + chunk_rows]
+            squared_error += float(np.vdot(difference, difference))
+        
+        mse = squared_error / original.size
+        if mse == 0:
+            return float('inf')
+        return 10 * np.log10(255.0 ** 2 / mse)
+    
+    def _get_output_cache(self) -> Optional["OutputCache"]:
+        """Output cache of this process (opened on first use), or None if caching is disabled"""
+        if self.cache_dir is None:
+            return None
+        if self._output_cache is None:
+            self._output_cache = OutputCache(Path(self.cache_dir), self.cache_max_bytes)
+        return self._output_cache
+    
+    def _flatten_alpha(self, img: Image.Image) -> Image.Image:
+        """Remove alpha channel - convert RGBA/LA to RGB with white background"""
+        background = Image.new('RGB', img.size, (255, 255, 255))
+        if img.mode == 'RGBA':
+            background.paste(img, mask=img.split()[-1])
+        else:
+            background.paste(img.convert('RGB'))
+        return background
+    
+    def _to_grayscale(self, img: Image.Image) -> Image.Image:
+        """Convert to grayscale for the black & white version"""
+        if img.mode == 'RGBA':
+            # Convert RGBA to LA (grayscale with alpha)
+            return img.convert('LA').convert('RGBA')
+        # Convert to grayscale (L mode)
+        return img.convert('L')
+    
+    def _use_strips(self, img: Image.Image) -> bool:
+        """Whether an image is large enough for strip processing"""
+        return self.tile_threshold is not None and img.width * img.height > self.tile_threshold
+    
+    def _process_in_strips(
+        self,
+        img: Image.Image,
+        stage: Callable[[Image.Image], Image.Image],
+        mode: str = None,
+        bytes_per_pixel: int = 16
+    ) -> Image.Image:
+        """
+        Apply a pixel-wise stage to horizontal strips of a very large image
+        
+        Images at or below tile_threshold pixels are passed to the stage whole.
+        
+        Args:
+            img: PIL Image object
+            stage: Function mapping an image region to a processed region of the same size
+            mode: Mode of the stage output (None = same mode, strips are written back into img)
+            bytes_per_pixel: Estimated working memory of the stage per pixel
+            
+        Returns:
+            Processed image
+        """
+        if not self._use_strips(img):
+            return stage(img)
+        
+        strip_rows = max(1, self.tile_memory_budget // (img.width * bytes_per_pixel))
+        output = img if mode is None else Image.new(mode, img.size)
+        
+        for top in range(0, img.height, strip_rows):
+            box = (0, top, img.width, min(top + strip_rows, img.height))
+            output.paste(stage(img.crop(box)), box)
+        
+        return output
     
     def _apply_fine_tuning(self, img: Image.Image) -> Image.Image:
         """
@@ -349,6 +2236,45 @@ class ImageToWebPConverter:
         Args:
             img: PIL Image object
             
+        Returns:
+            Adjusted PIL Image object
+        """
+        # Per-pixel color maps run as a single compiled 3D LUT pass
+        # (the LUT leaves an alpha channel untouched)
+        lut = None
+        if self.fine_tuning.get('auto_tone', False):
+            if max(img.size) > self.AUTO_TONE_PROXY_SIZE:
+                lut = self._get_auto_tone_lut(img)
+        elif self._use_fine_tuning_lut():
+            lut = self._get_fine_tuning_lut(img)
+        
+        if lut is not None:
+            return self._process_in_strips(img, lambda region: region.filter(lut), bytes_per_pixel=8)
+        
+        # Strips cannot measure the image-wide contrast pivot or auto tone statistics themselves
+        contrast_mean = None
+        auto_tone_params = None
+        if self._use_strips(img):
+            if self.fine_tuning.get('auto_tone', False):
+                _, auto_tone_params = self._auto_tone_pipeline(img.convert('RGB'))
+            elif self.fine_tuning.get('contrast', 0) != 0:
+                contrast_mean = self._contrast_mean(img)
+        
+        return self._process_in_strips(
+            img,
+            lambda region: self._fine_tune_region(region, contrast_mean, auto_tone_params),
+            bytes_per_pixel=40
+        )
+    
+    def _fine_tune_region(self, img: Image.Image, contrast_mean: int = None, auto_tone_params: dict = None) -> Image.Image:
+        """
+        Apply fine-tuning adjustments stage by stage
+        
+        Args:
+            img: PIL Image object (or a strip of one)
+            contrast_mean: Gray level contrast pivots around (None = mean of img itself)
+            auto_tone_params: Auto tone statistics of the whole image (None = measure them on img itself)
+            
         Returns:
             Adjusted PIL Image object
         """
@@ -364,50 +2290,12 @@ class ImageToWebPConverter:
         # Check for Auto Tone
         if self.fine_tuning.get('auto_tone', False):
             # Apply automatic tone adjustments
-            adjusted = self._apply_auto_tone(adjusted)
+            if auto_tone_params is not None:
+                adjusted, _ = self._auto_tone_pipeline(adjusted, auto_tone_params)
+            else:
+                adjusted = self._apply_auto_tone(adjusted)
         else:
-            # Manual adjustments
-            # Brightness/Exposure
-            if self.fine_tuning.get('exposure', 0) != 0:
-                factor = 1.0 + (self.fine_tuning['exposure'] * 0.5)  # -2 to +2 becomes 0 to 2
-                enhancer = ImageEnhance.Brightness(adjusted)
-                adjusted = enhancer.enhance(factor)
-        
-            # Contrast
-            if self.fine_tuning.get('contrast', 0) != 0:
-                factor = 1.0 + (self.fine_tuning['contrast'] / 100.0)
-                enhancer = ImageEnhance.Contrast(adjusted)
-                adjusted = enhancer.enhance(max(0.1, factor))
-            
-            # Color/Saturation
-            if self.fine_tuning.get('saturation', 0) != 0:
-                factor = 1.0 + (self.fine_tuning['saturation'] / 100.0)
-                enhancer = ImageEnhance.Color(adjusted)
-                adjusted = enhancer.enhance(max(0, factor))
-            
-            # Vibrance (more subtle saturation on less saturated colors)
-            if self.fine_tuning.get('vibrance', 0) != 0:
-                factor = 1.0 + (self.fine_tuning['vibrance'] / 200.0)  # Half the effect of saturation
-                enhancer = ImageEnhance.Color(adjusted)
-                adjusted = enhancer.enhance(max(0, factor))
-            
-            # Temperature (warm/cool adjustment)
-            if self.fine_tuning.get('temperature', 0) != 0:
-                adjusted = self._adjust_temperature(adjusted, self.fine_tuning['temperature'])
-            
-            # Tint (green/magenta adjustment)
-            if self.fine_tuning.get('tint', 0) != 0:
-                adjusted = self._adjust_tint(adjusted, self.fine_tuning['tint'])
-            
-            # Shadows/Highlights/Whites/Blacks - simplified tone curve adjustment
-            if any(self.fine_tuning.get(k, 0) != 0 for k in ['shadows', 'highlights', 'whites', 'blacks']):
-                adjusted = self._adjust_tones(
-                    adjusted,
-                    self.fine_tuning.get('shadows', 0),
-                    self.fine_tuning.get('highlights', 0),
-                    self.fine_tuning.get('whites', 0),
-                    self.fine_tuning.get('blacks', 0)
-                )
+            adjusted = self._apply_manual_adjustments(adjusted, contrast_mean)
         
         # Restore alpha channel if it existed
         if has_alpha:
@@ -416,6 +2304,175 @@ class ImageToWebPConverter:
         
         return adjusted
     
+    def _apply_manual_adjustments(self, adjusted: Image.Image, contrast_mean: int = None) -> Image.Image:
+        """
+        Apply the manual fine-tuning adjustments stage by stage
+        
+        Args:
+            adjusted: PIL Image object (RGB)
+            contrast_mean: Gray level contrast pivots around (None = mean of the image itself)
+            
+        Returns:
+            Adjusted PIL Image object
+        """
+        # Brightness/Exposure
+        if self.fine_tuning.get('exposure', 0) != 0:
+            factor = 1.0 + (self.fine_tuning['exposure'] * 0.5)  # -2 to +2 becomes 0 to 2
+            enhancer = ImageEnhance.Brightness(adjusted)
+            adjusted = enhancer.enhance(factor)
+        
+        # Contrast
+        if self.fine_tuning.get('contrast', 0) != 0:
+            factor = 1.0 + (self.fine_tuning['contrast'] / 100.0)
+            if contrast_mean is None:
+                enhancer = ImageEnhance.Contrast(adjusted)
+                adjusted = enhancer.enhance(max(0.1, factor))
+            else:
+                adjusted = self._adjust_contrast(adjusted, max(0.1, factor), contrast_mean)
+        
+        # Color/Saturation
+        if self.fine_tuning.get('saturation', 0) != 0:
+            factor = 1.0 + (self.fine_tuning['saturation'] / 100.0)
+            enhancer = ImageEnhance.Color(adjusted)
+            adjusted = enhancer.enhance(max(0, factor))
+        
+        # Vibrance (more subtle saturation on less saturated colors)
+        if self.fine_tuning.get('vibrance', 0) != 0:
+            factor = 1.0 + (self.fine_tuning['vibrance'] / 200.0)  # Half the effect of saturation
+            enhancer = ImageEnhance.Color(adjusted)
+            adjusted = enhancer.enhance(max(0, factor))
+        
+        # Temperature (warm/cool adjustment)
+        if self.fine_tuning.get('temperature', 0) != 0:
+            adjusted = self._adjust_temperature(adjusted, self.fine_tuning['temperature'])
+        
+        # Tint (green/magenta adjustment)
+        if self.fine_tuning.get('tint', 0) != 0:
+            adjusted = self._adjust_tint(adjusted, self.fine_tuning['tint'])
+        
+        # Shadows/Highlights/Whites/Blacks - simplified tone curve adjustment
+        if any(self.fine_tuning.get(k, 0) != 0 for k in ['shadows', 'highlights', 'whites', 'blacks']):
+            adjusted = self._adjust_tones(
+                adjusted,
+                self.fine_tuning.get('shadows', 0),
+                self.fine_tuning.get('highlights', 0),
+                self.fine_tuning.get('whites', 0),
+                self.fine_tuning.get('blacks', 0)
+            )
+        
+        return adjusted
+    
+    def _use_fine_tuning_lut(self) -> bool:
+        """Whether manual adjustments should run as one LUT pass instead of stage by stage"""
+        if not self.fine_tuning_lut or self.fine_tuning.get('auto_tone', False):
+            return False
+        
+        # A trilinear LUT pass costs about as much as a few simple enhance passes,
+        # so it only pays off for chained stages or the NumPy tone stage
+        if any(self.fine_tuning.get(k, 0) != 0 for k in ['shadows', 'highlights', 'whites', 'blacks']):
+            return True
+        stages = ['exposure', 'contrast', 'saturation', 'vibrance', 'temperature', 'tint']
+        return sum(1 for k in stages if self.fine_tuning.get(k, 0) != 0) > 2
+    
+    def _get_fine_tuning_lut(self, img: Image.Image) -> ImageFilter.Color3DLUT:
+        """
+        Get the compiled manual-adjustment LUT for an image
+        
+        Contrast is the only stage that depends on image content (its pivot gray level),
+        so LUTs are compiled once per converter and distinct contrast mean.
+        
+        Args:
+            img: PIL Image object (RGB or RGBA) the LUT will be applied to
+            
+        Returns:
+            Color3DLUT filter, or None if it would miss FINE_TUNING_LUT_TOLERANCE (run the stages instead)
+        """
+        contrast_mean = None
+        if self.fine_tuning.get('contrast', 0) != 0:
+            contrast_mean = self._contrast_mean(img)
+        
+        if contrast_mean not in self._lut_cache:
+            transform = lambda grid: self._apply_manual_adjustments(grid, contrast_mean)
+            lut = self._compile_lut(transform)
+            if self._lut_error(lut, transform) > self.FINE_TUNING_LUT_TOLERANCE - 1:
+                lut = None
+            self._lut_cache[contrast_mean] = lut
+        return self._lut_cache[contrast_mean]
+    
+    def _contrast_mean(self, img: Image.Image) -> int:
+        """
+        Mean gray level of the image after the exposure stage, as ImageEnhance.Contrast computes it there
+        
+        Large images are measured strip by strip, so no full-size exposed copy is made.
+        """
+        exposure = None
+        if self.fine_tuning.get('exposure', 0) != 0:
+            # The Brightness stage as per-channel tables, taken from the stage itself on a ramp
+            factor = 1.0 + (self.fine_tuning['exposure'] * 0.5)
+            ramp = Image.fromarray(np.repeat(np.arange(256, dtype=np.uint8), 3).reshape(1, 256, 3), 'RGB')
+            exposure = np.asarray(ImageEnhance.Brightness(ramp).enhance(factor))[0].T.ravel().tolist()
+        
+        strip_rows = img.height
+        if self._use_strips(img):
+            strip_rows = max(1, self.tile_memory_budget // (img.width * 8))
+        
+        histogram = np.zeros(256, dtype=np.int64)
+        for top in range(0, img.height, strip_rows):
+            region = img.crop((0, top, img.width, min(top + strip_rows, img.height))).convert('RGB')
+            if exposure is not None:
+                region = region.point(exposure)
+            histogram += region.convert('L').histogram()
+        
+        mean = np.dot(histogram, np.arange(256)) / max(1, histogram.sum())
+        return int(mean + 0.5)
+    
+    def _compile_lut(self, transform: Callable[[Image.Image], Image.Image]) -> ImageFilter.Color3DLUT:
+        """
+        Compile an RGB -> RGB color transform into a 3D LUT
+        
+        The transform is run once on an identity grid image holding every LUT node.
+        
+        Args:
+            transform: Function mapping an RGB image to an adjusted RGB image of the same size
+            
+        Returns:
+            Color3DLUT filter equivalent to transform (trilinear interpolation between nodes)
+        """
+        size = self.LUT_SIZE
+        levels = np.linspace(0, 255, size).round().astype(np.uint8)
+        # Color3DLUT tables are ordered with red changing fastest, then green, then blue
+        blue, green, red = np.meshgrid(levels, levels, levels, indexing='ij')
+        grid = np.stack([red, green, blue], axis=-1).reshape(size * size, size, 3)
+        
+        table = np.asarray(transform(Image.fromarray(grid, 'RGB')), dtype=np.float32) / 255.0
+        return ImageFilter.Color3DLUT(size, table.reshape(size, size, size, 3))
+    
+    def _lut_error(self, lut: ImageFilter.Color3DLUT, transform: Callable[[Image.Image], Image.Image]) -> int:
+        """
+        Largest difference between a compiled LUT and its transform at the centres of the grid cells
+        
+        Args:
+            lut: LUT compiled from transform by _compile_lut
+            transform: Function mapping an RGB image to an adjusted RGB image of the same size
+            
+        Returns:
+            Maximum absolute difference in 8-bit levels
+        """
+        nodes = np.linspace(0, 255, self.LUT_SIZE).round()
+        centres = ((nodes[:-1] + nodes[1:]) / 2).astype(np.uint8)
+        size = len(centres)
+        blue, green, red = np.meshgrid(centres, centres, centres, indexing='ij')
+        probe = Image.fromarray(np.stack([red, green, blue], axis=-1).reshape(size * size, size, 3), 'RGB')
+        
+        interpolated = np.asarray(probe.filter(lut), dtype=np.int16)
+        exact = np.asarray(transform(probe), dtype=np.int16)
+        return int(np.abs(interpolated - exact).max())
+    
+    def _adjust_contrast(self, img: Image.Image, factor: float, mean: int) -> Image.Image:
+        """Adjust contrast around a given gray level (ImageEnhance.Contrast with a fixed mean)"""
+        degenerate = Image.new('RGB', img.size, (mean, mean, mean))
+        return Image.blend(degenerate, img, factor)
+    
     def _adjust_temperature(self, img: Image.Image, temp: float) -> Image.Image:
         """Adjust color temperature (warm/cool)"""
         r, g, b = img.split()
@@ -446,81 +2503,166 @@ class ImageToWebPConverter:
         
         return Image.merge('RGB', (r, g, b))
     
-    def _adjust_tones(self, img: Image.Image, shadows: float, highlights: float, whites: float, blacks: float) -> Image.Image:
-        """Adjust tonal ranges (shadows, highlights, whites, blacks)"""
-        # Convert to numpy array for pixel-level manipulation
-        img_array = np.array(img, dtype=np.float32)
-        
-        # Normalize adjustments
-        shadows_adj = shadows / 100.0
-        highlights_adj = highlights / 100.0
-        whites_adj = whites / 100.0
-        blacks_adj = blacks / 100.0
-        
-        # Create luminosity mask (0-1 range)
-        luminosity = np.mean(img_array, axis=2) / 255.0
-        
-        # Apply adjustments based on tonal range
-        # Shadows (dark areas, luminosity < 0.3)
-        shadow_mask = np.maximum(0, 1 - (luminosity / 0.3)) ** 2
-        shadow_mask = np.stack([shadow_mask] * 3, axis=2)
-        img_array += shadow_mask * shadows_adj * 50
+    def _adjust_tones(self, img: Image.Image, shadows: float, highlights: float, whites: float, blacks: float, chunk_rows: int = None) -> Image.Image:
+        """
+        Adjust tonal ranges (shadows, highlights, whites, blacks)
         
-        # Highlights (bright areas, luminosity > 0.7)
-        highlight_mask = np.maximum(0, (luminosity - 0.7) / 0.3) ** 2
-        highlight_mask = np.stack([highlight_mask] * 3, axis=2)
-        img_array += highlight_mask * highlights_adj * 50
+        Args:
+            img: PIL Image object (RGB)
+            shadows, highlights, whites, blacks: Adjustments (-100 to 100)
+            chunk_rows: Rows processed per pass (None = sized from TONE_CHUNK_BYTES)
+            
+        Returns:
+            Adjusted PIL Image object
+        """
+        # Normalize adjustments and scale to pixel offsets per tonal range
+        offsets = {
+            'shadows': (shadows / 100.0, 50),
+            'highlights': (highlights / 100.0, 50),
+            'whites': (whites / 100.0, 30),
+            'blacks': (blacks / 100.0, 30),
+        }
+        
+        # The uint8 result is written in place; float work happens one row chunk at a time
+        pixels = np.array(img, dtype=np.uint8)
+        if chunk_rows is None:
+            # float32 work buffer + luminosity + mask = 20 bytes per pixel
+            chunk_rows = max(1, self.TONE_CHUNK_BYTES // (img.width * 20))
+        
+        for top in range(0, pixels.shape[0], chunk_rows):
+            self._adjust_tone_rows(pixels[top:top + chunk_rows], offsets)
+        
+        return Image.fromarray(pixels)
+    
+    def _adjust_tone_rows(self, rows: np.ndarray, offsets: dict) -> None:
+        """
+        Adjust tonal ranges of a block of uint8 RGB rows in place
         
-        # Whites (very bright, luminosity > 0.85)
-        white_mask = np.maximum(0, (luminosity - 0.85) / 0.15) ** 2
-        white_mask = np.stack([white_mask] * 3, axis=2)
-        img_array += white_mask * whites_adj * 30
+        Masks stay 2-D and broadcast over the channels; a single float32 buffer is used.
         
-        # Blacks (very dark, luminosity < 0.15)
-        black_mask = np.maximum(0, 1 - (luminosity / 0.15)) ** 2
-        black_mask = np.stack([black_mask] * 3, axis=2)
-        img_array += black_mask * blacks_adj * 30
+        Args:
+            rows: uint8 array of shape (height, width, 3), modified in place
+            offsets: Tonal range name -> (normalized adjustment, offset scale)
+        """
+        work = rows.astype(np.float32)
         
-        # Clip values to valid range
-        img_array = np.clip(img_array, 0, 255)
+        # Create luminosity mask (0-1 range)
+        luminosity = np.mean(work, axis=2)
+        luminosity /= 255.0
+        mask = np.empty_like(luminosity)
         
-        return Image.fromarray(img_array.astype(np.uint8))
+        for name, (adjustment, scale) in offsets.items():
+            if adjustment == 0:
+                continue
+            
+            if name == 'shadows':
+                # Shadows (dark areas, luminosity < 0.3)
+                np.divide(luminosity, 0.3, out=mask)
+                np.subtract(1, mask, out=mask)
+            elif name == 'highlights':
+                # Highlights (bright areas, luminosity > 0.7)
+                np.subtract(luminosity, 0.7, out=mask)
+                mask /= 0.3
+            elif name == 'whites':
+                # Whites (very bright, luminosity > 0.85)
+                np.subtract(luminosity, 0.85, out=mask)
+                mask /= 0.15
+            else:
+                # Blacks (very dark, luminosity < 0.15)
+                np.divide(luminosity, 0.15, out=mask)
+                np.subtract(1, mask, out=mask)
+            
+            np.maximum(mask, 0, out=mask)
+            np.square(mask, out=mask)
+            mask *= adjustment
+            mask *= scale
+            work += mask[:, :, np.newaxis]
+        
+        # Clip values to valid range and write back (truncating like astype)
+        np.clip(work, 0, 255, out=work)
+        np.copyto(rows, work, casting='unsafe')
     
     def _apply_auto_tone(self, img: Image.Image) -> Image.Image:
         """
         Apply automatic tone adjustments (like Photoshop Auto Tone)
         Uses histogram analysis for intelligent corrections
         
+        Statistics are gathered on a small proxy of large images; all corrections
+        are then per-pixel color maps, applied to the full image as one 3D LUT pass.
+        
         Args:
             img: PIL Image object (RGB)
             
         Returns:
             Auto-corrected PIL Image object
         """
-        # Convert to numpy for analysis
-        img_array = np.array(img, dtype=np.float32)
+        if max(img.size) <= self.AUTO_TONE_PROXY_SIZE:
+            adjusted_img, _ = self._auto_tone_pipeline(img)
+            return adjusted_img
         
-        # Analyze histogram for each channel
-        adjusted = img_array.copy()
+        return img.filter(self._get_auto_tone_lut(img))
+    
+    def _get_auto_tone_lut(self, img: Image.Image) -> ImageFilter.Color3DLUT:
+        """
+        Measure auto tone statistics on a proxy of img and compile the corrections into a 3D LUT
         
-        # 1. Auto Levels - Stretch histogram to full range
-        for i in range(3):  # R, G, B
-            channel = adjusted[:, :, i]
+        Args:
+            img: PIL Image object (RGB or RGBA)
             
-            # Find 1st and 99th percentile (ignore extreme outliers)
-            low_percentile = np.percentile(channel, 1)
-            high_percentile = np.percentile(channel, 99)
+        Returns:
+            Color3DLUT filter
+        """
+        # Nearest-neighbour sampling keeps the pixel value distribution intact for percentiles
+        scale = self.AUTO_TONE_PROXY_SIZE / max(img.size)
+        proxy = img.resize(
+            (max(1, round(img.width * scale)), max(1, round(img.height * scale))),
+            Image.Resampling.NEAREST
+        ).convert('RGB')
+        _, params = self._auto_tone_pipeline(proxy)
+        
+        return self._compile_lut(lambda grid: self._auto_tone_pipeline(grid, params)[0])
+    
+    def _auto_tone_pipeline(self, img: Image.Image, params: dict = None) -> tuple[Image.Image, dict]:
+        """
+        Run the auto tone stages on an image
+        
+        Args:
+            img: PIL Image object (RGB)
+            params: Image statistics from a previous run (None = measure them on img)
             
-            # Stretch the histogram
-            if high_percentile > low_percentile:
-                channel = (channel - low_percentile) * (255.0 / (high_percentile - low_percentile))
-                channel = np.clip(channel, 0, 255)
-                adjusted[:, :, i] = channel
+        Returns:
+            Tuple of (auto-corrected image, statistics used)
+        """
+        if params is None:
+            params = {}
+        
+        # 1. Auto Levels - Stretch histogram to full range
+        # 8-bit channels: read the percentiles straight off the 256-bin histograms
+        # and apply the stretch as a per-channel lookup table
+        if 'levels' not in params:
+            histogram = img.histogram()
+            lookup = []
+            for i in range(3):  # R, G, B
+                channel_histogram = histogram[i * 256:(i + 1) * 256]
+                
+                # Find 1st and 99th percentile (ignore extreme outliers)
+                low_percentile = self._histogram_percentile(channel_histogram, 1)
+                high_percentile = self._histogram_percentile(channel_histogram, 99)
+                
+                # Stretch the histogram
+                levels = np.arange(256, dtype=np.float32)
+                if high_percentile > low_percentile:
+                    scale = np.float32(255.0) / np.float32(high_percentile - low_percentile)
+                    levels = np.clip((levels - np.float32(low_percentile)) * scale, 0, 255)
+                lookup.extend(levels.astype(np.uint8).tolist())
+            params['levels'] = lookup
+        
+        adjusted_img = img.point(params['levels'])
         
         # 2. Auto Contrast - Enhance overall contrast
-        adjusted_img = Image.fromarray(adjusted.astype(np.uint8))
-        enhancer = ImageEnhance.Contrast(adjusted_img)
-        adjusted_img = enhancer.enhance(1.15)  # Slight contrast boost
+        if 'contrast_mean' not in params:
+            params['contrast_mean'] = int(ImageStat.Stat(adjusted_img.convert('L')).mean[0] + 0.5)
+        adjusted_img = self._adjust_contrast(adjusted_img, 1.15, params['contrast_mean'])  # Slight contrast boost
         
         # 3. Recover blown highlights and blocked shadows
         adjusted = np.array(adjusted_img, dtype=np.float32)
@@ -537,19 +2679,27 @@ class ImageToWebPConverter:
         adjusted += shadow_mask * 30  # Lift shadows
         
         # 4. Auto White Balance - Correct color cast
-        # Calculate average color for mid-tones
-        mid_tone_mask = (luminosity > 0.3) & (luminosity < 0.7)
-        if np.any(mid_tone_mask):
-            mid_tone_avg = np.mean(adjusted[mid_tone_mask], axis=0)
-            target_gray = np.mean(mid_tone_avg)
-            
-            # Adjust each channel to neutral
-            for i in range(3):
-                if mid_tone_avg[i] > 0:
-                    correction_factor = target_gray / mid_tone_avg[i]
-                    # Apply subtle correction (limit the effect)
-                    correction_factor = 1.0 + (correction_factor - 1.0) * 0.3
-                    adjusted[:, :, i] *= correction_factor
+        if 'white_balance' not in params:
+            # Calculate average color for mid-tones
+            corrections = []
+            mid_tone_mask = (luminosity > 0.3) & (luminosity < 0.7)
+            if np.any(mid_tone_mask):
+                mid_tone_avg = np.mean(adjusted[mid_tone_mask], axis=0)
+                target_gray = np.mean(mid_tone_avg)
+                
+                # Adjust each channel to neutral
+                for i in range(3):
+                    if mid_tone_avg[i] > 0:
+                        correction_factor = target_gray / mid_tone_avg[i]
+                        # Apply subtle correction (limit the effect)
+                        corrections.append(1.0 + (correction_factor - 1.0) * 0.3)
+                    else:
+                        corrections.append(None)
+            params['white_balance'] = corrections
+        
+        for i, correction_factor in enumerate(params['white_balance']):
+            if correction_factor is not None:
+                adjusted[:, :, i] *= correction_factor
         
         # 5. Enhance vibrance (boost muted colors more than saturated ones)
         adjusted_img = Image.fromarray(np.clip(adjusted, 0, 255).astype(np.uint8))
@@ -570,21 +2720,53 @@ class ImageToWebPConverter:
         
         # 6. Final exposure adjustment based on overall brightness
         adjusted = np.array(adjusted_img, dtype=np.float32)
-        avg_brightness = np.mean(adjusted) / 255.0
-        
-        # If image is too dark or too bright, adjust
-        if avg_brightness < 0.45:
-            # Image is too dark, brighten
-            exposure_adjust = (0.5 - avg_brightness) * 0.6
-            adjusted *= (1.0 + exposure_adjust)
-        elif avg_brightness > 0.65:
-            # Image is too bright, darken slightly
-            exposure_adjust = (avg_brightness - 0.6) * 0.4
-            adjusted *= (1.0 - exposure_adjust)
+        if 'exposure' not in params:
+            avg_brightness = np.mean(adjusted) / 255.0
+            
+            # If image is too dark or too bright, adjust
+            params['exposure'] = None
+            if avg_brightness < 0.45:
+                # Image is too dark, brighten
+                exposure_adjust = (0.5 - avg_brightness) * 0.6
+                params['exposure'] = 1.0 + exposure_adjust
+            elif avg_brightness > 0.65:
+                # Image is too bright, darken slightly
+                exposure_adjust = (avg_brightness - 0.6) * 0.4
+                params['exposure'] = 1.0 - exposure_adjust
+        
+        if params['exposure'] is not None:
+            adjusted *= params['exposure']
         
         # Final clip and return
         adjusted = np.clip(adjusted, 0, 255)
-        return Image.fromarray(adjusted.astype(np.uint8))
+        return Image.fromarray(adjusted.astype(np.uint8)), params
+    
+    def _histogram_percentile(self, histogram: list, percent: float) -> float:
+        """
+        Percentile of 8-bit data from its 256-bin histogram
+        
+        Matches np.percentile (linear interpolation) on the underlying pixel values.
+        
+        Args:
+            histogram: 256 bin counts
+            percent: Percentile to compute (0-100)
+            
+        Returns:
+            Percentile value
+        """
+        cumulative = np.cumsum(histogram)
+        count = int(cumulative[-1])
+        if count == 0:
+            return 0.0
+        
+        # Position of the percentile in the sorted pixel values, and its neighbours
+        rank = percent / 100.0 * (count - 1)
+        lower_rank = int(np.floor(rank))
+        upper_rank = min(lower_rank + 1, count - 1)
+        lower = int(np.searchsorted(cumulative, lower_rank, side='right'))
+        upper = int(np.searchsorted(cumulative, upper_rank, side='right'))
+        
+        return lower + (rank - lower_rank) * (upper - lower)
     
     def _get_unique_folder_name(self, base_folder: str) -> str:
         """
@@ -596,19 +2778,11 @@ class ImageToWebPConverter:
         Returns:
             Unique folder path with version suffix if needed
         """
-        output_folder = f"{base_folder}_WebP"
-        
-        # Check if folder already exists
-        if not Path(output_folder).exists():
-            return output_folder
-        
-        # Find next available version number
-        version = 2
-        while True:
-            versioned_folder = f"{base_folder}_WebP_{version}"
-            if not Path(versioned_folder).exists():
-                return versioned_folder
-            version += 1
+        base_path = Path(base_folder)
+        version = self._next_version(base_path.parent, [f"{base_path.name}_WebP"])
+        if version == 1:
+            return f"{base_folder}_WebP"
+        return f"{base_folder}_WebP_{version}"
     
     def _get_unique_file_name(self, source_path: Path, output_dir: Path = None) -> Path:
         """
@@ -623,31 +2797,109 @@ class ImageToWebPConverter:
         """
         if output_dir is None:
             output_dir = source_path.parent
+        
+        # Every file the conversion writes (B&W and width variants) takes the suffix of the
+        # returned name, so pick a version that is free for all of them
+        plain_names = [path.name for path in self._output_paths(source_path, output_dir).values()]
+        
+        version = self._next_version(output_dir, plain_names)
+        if version == 1:
+            return output_dir / f"{source_path.stem}.webp"
+        return output_dir / f"{source_path.stem}_WebP_{version}.webp"
+    
+    def _next_version(self, directory: Path, names: list) -> int:
+        """
+        Pick the version shared by a set of output names: 1 (the plain names) if none of them is present,
+        else one above the highest version of any of them
+        
+        Nothing is reserved here; callers record the name with _remember_output_name once the output exists.
+        
+        Args:
+            directory: Directory the outputs go into
+            names: Unversioned output names (name_WebP for folders; name.webp, name_bw.webp,
+                name_<width>w.webp and name_<width>w_bw.webp for files)
             
-        output_file = output_dir / f"{source_path.stem}.webp"
+        Returns:
+            Version number (1 = unversioned)
+        """
+        present, versions = self._name_index(directory)
+        keys = [os.path.normcase(name) for name in names]
+        if not any(key in present for key in keys):
+            return 1
+        highest = max(max(versions.get(key, 0), 1 if key in present else 0) for key in keys)
+        return max(highest + 1, 2)
+    
+    def _remember_output_name(self, path: Path) -> None:
+        """
+        Record a created output in its directory's name index
+        
+        The index is otherwise only refreshed when the directory's mtime changes, which may not
+        happen between two outputs on filesystems with coarse timestamps.
+        
+        Args:
+            path: Output file or folder that now exists
+        """
+        cached = self._name_indexes.get(str(path.parent))
+        if cached is not None:
+            self._index_name(cached[1], cached[2], path.name)
+    
+    def _name_index(self, directory: Path) -> tuple:
+        """
+        Names present in a directory and the highest version of every output name, from one scandir
         
-        # Check if file already exists
-        if not output_file.exists():
-            return output_file
+        The index is kept for the run and rebuilt only when the directory's mtime changes.
+        
+        Args:
+            directory: Directory to index
+            
+        Returns:
+            Tuple of (set of normcased names present, dictionary of normcased unversioned name -> highest version present)
+        """
+        try:
+            mtime = os.stat(directory).st_mtime_ns
+        except FileNotFoundError:
+            return set(), {}
+        
+        cached = self._name_indexes.get(str(directory))
+        if cached is not None and cached[0] == mtime:
+            return cached[1], cached[2]
+        
+        present = set()
+        versions = {}
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                self._index_name(present, versions, entry.name)
+        
+        self._name_indexes[str(directory)] = (mtime, present, versions)
+        return present, versions
+    
+    def _index_name(self, present: set, versions: dict, name: str) -> None:
+        """
+        Add one directory entry to a name index
         
-        # Find next available version number
-        version = 2
-        while True:
-            versioned_file = output_dir / f"{source_path.stem}_WebP_{version}.webp"
-            if not versioned_file.exists():
-                return versioned_file
-            version += 1
+        Args:
+            present: Set of normcased names present
+            versions: Dictionary of normcased unversioned name -> highest version present
+            name: Directory entry name
+        """
+        present.add(os.path.normcase(name))
+        match = self.VERSIONED_NAME.match(name)
+        if match:
+            # name_WebP_<n>.webp is version n of name.webp, name_WebP_<n>_<w>w[_bw].webp of
+            # name_<w>w[_bw].webp and name_WebP_<n> of name_WebP
+            base = os.path.normcase(match.group(1) + (match.group(3) or '_WebP'))
+            versions[base] = max(versions.get(base, 0), int(match.group(2)))
     
     def _calculate_uniform_dimensions(
         self,
-        directory: Path,
+        manifest: ScanManifest,
         progress_callback: Optional[Callable[[str, int, int], None]] = None
     ) -> tuple[int, int]:
         """
         Analyze all images in folder to calculate optimal uniform dimensions
         
         Args:
-            directory: Source directory to analyze
+            manifest: Scan manifest of the source tree
             progress_callback: Progress callback function
             
         Returns:
@@ -656,26 +2908,17 @@ class ImageToWebPConverter:
         if progress_callback:
             progress_callback("🔍 Analyzing images for optimal dimensions...", 0, self.total_files)
         
-        ratios = []
+        # Collect aspect ratios from all image headers (unreadable images are skipped)
+        headers = self._probe_headers([entry for entry in manifest.files if entry.is_image])
+        ratios = np.array([height / width for width, height, _ in filter(None, headers)])
         
-        # Collect aspect ratios from all images
-        for item in directory.rglob('*'):
-            if item.is_file() and item.suffix.lower() in self.SUPPORTED_FORMATS:
-                try:
-                    with Image.open(item) as img:
-                        width, height = img.size
-                        ratio = height / width
-                        ratios.append(ratio)
-                except Exception:
-                    continue
-        
-        if not ratios:
+        if not ratios.size:
             # Fallback: use target width with square dimensions
             return (self.target_width, self.target_width)
         
-        # Calculate median ratio (more robust than mean)
-        ratios.sort()
-        median_ratio = ratios[len(ratios) // 2]
+        # Calculate median ratio (more robust than mean); selection instead of a full sort
+        middle = ratios.size // 2
+        median_ratio = float(np.partition(ratios, middle)[middle])
         
         # Calculate dimensions based on orientation preference
         if self.uniform_orientation == "horizontal":
@@ -709,43 +2952,105 @@ class ImageToWebPConverter:
         
         return (target_width, target_height)
     
-    def _crop_to_uniform_size(self, img: Image.Image, target_w: int, target_h: int) -> Image.Image:
+    def _draft(self, img: Image.Image, size: tuple[int, int]) -> Optional[tuple]:
         """
-        Resize and crop image to exact uniform dimensions
+        Let JPEG decoding downscale in the DCT domain (1/2, 1/4 or 1/8) while staying at or above size
+        
+        Must be called before the image data is loaded.
+        
+        Args:
+            img: Freshly opened PIL Image object
+            size: Smallest (width, height) the decoded image may have
+            
+        Returns:
+            Region of the drafted image covering the original frame, or None if not drafted
+        """
+        if img.format != 'JPEG':
+            return None
+        
+        result = img.draft(img.mode, size)
+        return result[1] if result else None
+    
+    def _resize(self, img: Image.Image, size: tuple[int, int], box: tuple = None) -> Image.Image:
+        """
+        Resize with LANCZOS, optionally pre-shrinking with reduce() according to resample_mode
         
         Args:
             img: PIL Image object
-            target_w: Target width
-            target_h: Target height
+            size: Output (width, height)
+            box: Optional source region to resample
             
         Returns:
-            Resized and cropped image
+            Resized image
         """
-        original_w, original_h = img.size
+        return img.resize(
+            size,
+            Image.Resampling.LANCZOS,
+            box=box,
+            reducing_gap=self.RESAMPLE_MODES[self.resample_mode]
+        )
+    
+    def _cover_size(self, original_w: float, original_h: float, target_w: int, target_h: int) -> tuple[int, int]:
+        """Size an image must be resized to so that it covers target dimensions (larger dimension)"""
         target_ratio = target_h / target_w
         original_ratio = original_h / original_w
         
-        # Resize image to cover target dimensions (larger dimension)
         if original_ratio > target_ratio:
             # Image is taller, fit to width
-            new_width = target_w
-            new_height = int(target_w * original_ratio)
-        else:
-            # Image is wider, fit to height
-            new_height = target_h
-            new_width = int(target_h / original_ratio)
+            return target_w, int(target_w * original_ratio)
+        # Image is wider, fit to height
+        return int(target_h / original_ratio), target_h
+    
+    def _center_crop_box(self, source_box: tuple, resized_size: tuple[int, int], crop_size: tuple[int, int]) -> tuple:
+        """
+        Map a center crop of the resized image back to source coordinates
         
-        # Resize with high quality
-        img = img.resize((new_width, new_height), Image.Resampling.LANCZOS)
+        Args:
+            source_box: Region of the source image that would be resized
+            resized_size: (width, height) the source region would be resized to
+            crop_size: (width, height) of the center crop taken from the resized image
+            
+        Returns:
+            Source region whose resize to crop_size equals resize-then-crop
+        """
+        scale_x = (source_box[2] - source_box[0]) / resized_size[0]
+        scale_y = (source_box[3] - source_box[1]) / resized_size[1]
+        
+        # Calculate crop coordinates in the resized image (center crop)
+        left = (resized_size[0] - crop_size[0]) // 2
+        top = (resized_size[1] - crop_size[1]) // 2
+        
+        return (
+            source_box[0] + left * scale_x,
+            source_box[1] + top * scale_y,
+            source_box[0] + (left + crop_size[0]) * scale_x,
+            source_box[1] + (top + crop_size[1]) * scale_y
+        )
+    
+    def _crop_to_uniform_size(self, img: Image.Image, target_w: int, target_h: int, source_box: tuple = None) -> Image.Image:
+        """
+        Resize and crop image to exact uniform dimensions
+        
+        Args:
+            img: PIL Image object
+            target_w: Target width
+            target_h: Target height
+            source_box: Region of img holding the original frame (from _draft), defaults to the whole image
+            
+        Returns:
+            Resized and cropped image
+        """
+        if source_box is None:
+            source_box = (0, 0) + img.size
+        original_w = source_box[2] - source_box[0]
+        original_h = source_box[3] - source_box[1]
         
-        # Calculate crop coordinates (center crop)
-        left = (new_width - target_w) // 2
-        top = (new_height - target_h) // 2
-        right = left + target_w
-        bottom = top + target_h
+        # Size the image would need to cover target dimensions (larger dimension)
+        new_width, new_height = self._cover_size(original_w, original_h, target_w, target_h)
         
-        # Crop to exact dimensions
-        img = img.crop((left, top, right, bottom))
+        # Resample only the source region that survives the center crop, with high quality
+        crop_box = self._center_crop_box(source_box, (new_width, new_height), (target_w, target_h))
+        img = self._resize(img, (target_w, target_h), crop_box)
         
         return img
 
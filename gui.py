@@ -7,6 +7,7 @@ Legacy UI is kept as fallback.
 """
 import os
 import sys
+import multiprocessing
 import threading
 from pathlib import Path
 import customtkinter as ctk
@@ -893,4 +894,6 @@ def main():
 
 
 if __name__ == "__main__":
+    # Required for the converter's process pool in frozen (PyInstaller) builds
+    multiprocessing.freeze_support()
     main()
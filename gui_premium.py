@@ -6,6 +6,7 @@ Version: 2.0 Premium
 """
 import os
 import sys
+import multiprocessing
 import threading
 from pathlib import Path
 from tkinter import filedialog, messagebox
@@ -1433,4 +1434,6 @@ def main():
 
 
 if __name__ == "__main__":
+    # Required for the converter's process pool in frozen (PyInstaller) builds
+    multiprocessing.freeze_support()
     main()
@@ -78,5 +78,527 @@ def test_conversion():
     print("\n✨ Test completed successfully!")
     print(f"Check the '{output_folder}' folder to see the results.\n")
 
+def test_adaptive_bw_with_cache():
+    """Adaptive quality + B&W version + output cache (B&W is encoded on a helper thread)"""
+    import shutil
+    import tempfile
+    
+    print("\n" + "-"*60)
+    print("Testing adaptive quality with B&W versions and output cache...")
+    print("-"*60 + "\n")
+    
+    test_folder = create_test_images()
+    work_dir = tempfile.mkdtemp()
+    try:
+        for options in ({'target_bytes': 2000}, {'target_psnr': 35}):
+            for workers, pipeline in ((1, False), (1, True), (2, False)):
+                converter = ImageToWebPConverter(
+                    create_bw=True,
+                    cache_dir=os.path.join(work_dir, "cache"),
+                    workers=workers,
+                    pipeline=pipeline,
+                    **options
+                )
+                output_folder = os.path.join(work_dir, f"out_{len(os.listdir(work_dir))}")
+                _, total, processed, errors = converter.convert_folder(test_folder, output_folder)
+                assert not errors, errors
+                assert processed == total, (processed, total)
+                print(f"✅ {options}, workers={workers}, pipeline={pipeline}: {processed}/{total}")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+def test_passthrough_rerun():
+    """Re-running into the same output replaces files another passthrough mode linked there"""
+    import shutil
+    import tempfile
+    
+    print("\n" + "-"*60)
+    print("Testing passthrough re-runs across modes...")
+    print("-"*60 + "\n")
+    
+    work_dir = tempfile.mkdtemp()
+    try:
+        source_folder = os.path.join(work_dir, "source")
+        shutil.copytree(create_test_images(), source_folder)
+        notes = os.path.join(source_folder, "notes.txt")
+        with open(notes, "w") as f:
+            f.write("original")
+        
+        for incremental in (False, True):
+            output_folder = os.path.join(work_dir, f"out_{incremental}")
+            for passthrough in ('hardlink', 'copy', 'symlink', 'copy', 'reflink', 'hardlink'):
+                converter = ImageToWebPConverter(passthrough=passthrough, incremental=incremental, workers=1)
+                _, _, _, errors = converter.convert_folder(source_folder, output_folder)
+                assert not errors, (passthrough, errors)
+                placed = os.path.join(output_folder, "notes.txt")
+                with open(placed) as f:
+                    assert f.read() == "original"
+                assert os.path.islink(placed) == (passthrough == 'symlink'), passthrough
+                assert not [name for name in os.listdir(output_folder) if name.endswith('.tmp')]
+            
+            # A copy must not write through a hardlink left by the previous run
+            ImageToWebPConverter(passthrough='copy', incremental=incremental, workers=1).convert_folder(source_folder, output_folder)
+            with open(os.path.join(output_folder, "notes.txt"), "w") as f:
+                f.write("edited copy")
+            with open(notes) as f:
+                assert f.read() == "original"
+            print(f"✅ incremental={incremental}: hardlink/copy/symlink/reflink re-runs")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+def test_single_file_versioning():
+    """Single-file conversion never overwrites an earlier output"""
+    import shutil
+    import tempfile
+    
+    print("\n" + "-"*60)
+    print("Testing single-file output versioning...")
+    print("-"*60 + "\n")
+    
+    work_dir = tempfile.mkdtemp()
+    try:
+        source = os.path.join(work_dir, "p.jpg")
+        Image.new('RGB', (400, 300), color='red').save(source)
+        
+        def convert(output_folder, **options):
+            output_file, _, _, errors = ImageToWebPConverter(**options).convert_single_file(source, output_folder)
+            assert not errors, errors
+            return os.path.basename(output_file)
+        
+        # Responsive runs with different widths share no largest variant
+        responsive = os.path.join(work_dir, "responsive")
+        assert convert(responsive, target_widths=[300, 100]) == "p_300w.webp"
+        first_run = os.path.getmtime(os.path.join(responsive, "p_100w.webp"))
+        assert convert(responsive, target_widths=[200, 100]) == "p_WebP_2_200w.webp"
+        assert os.path.getmtime(os.path.join(responsive, "p_100w.webp")) == first_run
+        assert convert(responsive, target_widths=[200, 100], create_bw=True) == "p_WebP_3_200w.webp"
+        assert convert(responsive, target_widths=[50], create_bw=True) == "p_50w.webp"
+        assert convert(responsive, target_widths=[100]) == "p_WebP_4_100w.webp"
+        
+        # A gap in the versions: the plain name is used when it is free
+        gap = os.path.join(work_dir, "gap")
+        os.makedirs(gap)
+        open(os.path.join(gap, "p_WebP_3.webp"), "wb").close()
+        assert convert(gap) == "p.webp"
+        assert convert(gap) == "p_WebP_4.webp"
+        assert convert(gap, create_bw=True) == "p_WebP_5.webp"
+        
+        # A failed conversion does not use up a version
+        broken = os.path.join(work_dir, "broken.jpg")
+        with open(broken, "wb") as f:
+            f.write(b"not an image")
+        failed = os.path.join(work_dir, "failed")
+        for _ in range(2):
+            output_file, _, _, errors = ImageToWebPConverter().convert_single_file(broken, failed)
+            assert errors and os.path.basename(output_file) == "broken.webp", output_file
+        assert os.listdir(failed) == []
+        print("✅ Responsive, gap and failed-conversion versioning")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+def test_memory_admission():
+    """The memory scheduler passes over a job that does not fit at most once"""
+    from collections import deque
+    from pathlib import Path
+    from converter import ConversionJob
+    
+    print("\n" + "-"*60)
+    print("Testing memory-budget job admission...")
+    print("-"*60 + "\n")
+    
+    converter = ImageToWebPConverter(memory_budget=100, workers=2)
+    pending = deque(ConversionJob(Path(f"{memory}.jpg"), Path("out"), memory=memory) for memory in (80, 10, 10, 10))
+    
+    # 30 running: the 80 job does not fit, a 10 job starts in its place
+    job = converter._next_admissible_job(pending, 30, True)
+    assert job.memory == 10 and pending[0].memory == 80
+    # The head was already passed over: wait for it instead of starting more small jobs
+    assert converter._next_admissible_job(pending, 40, True, head_skipped=True) is None
+    # Enough memory freed: the head starts
+    assert converter._next_admissible_job(pending, 20, True, head_skipped=True).memory == 80
+    # Nothing running: the head always starts
+    assert converter._next_admissible_job(deque([ConversionJob(Path("x"), Path("out"), memory=500)]), 0, False).memory == 500
+    print("✅ Head job admission")
+
+def test_header_cache():
+    """Uniform-size analysis reuses image headers cached by an earlier run"""
+    import shutil
+    import tempfile
+    
+    print("\n" + "-"*60)
+    print("Testing the persistent header cache...")
+    print("-"*60 + "\n")
+    
+    test_folder = create_test_images()
+    work_dir = tempfile.mkdtemp()
+    try:
+        probed = []
+        for run in range(2):
+            converter = ImageToWebPConverter(
+                uniform_size=True,
+                target_width=50,
+                metadata_cache=os.path.join(work_dir, "metadata.sqlite")
+            )
+            probe_image = converter._probe_image
+            converter._probe_image = lambda path: probed.append(path) or probe_image(path)
+            _, total, processed, errors = converter.convert_folder(test_folder, os.path.join(work_dir, f"out_{run}"))
+            assert not errors and processed == total, errors
+        
+        # Every header was read once, by the first run
+        assert len(probed) == total, probed
+        print(f"✅ Second run probed no headers ({total} cached)")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+def test_strip_auto_tone():
+    """Auto tone on strips matches auto tone on the whole image"""
+    import numpy as np
+    
+    print("\n" + "-"*60)
+    print("Testing auto tone with strip processing...")
+    print("-"*60 + "\n")
+    
+    # Two-tone image: each strip alone would see only one of the tones
+    pixels = np.zeros((200, 200, 3), np.uint8)
+    pixels[:100] = 60
+    pixels[100:] = 180
+    pixels[::7, ::5] = (90, 140, 200)
+    
+    for mode in ('RGB', 'RGBA'):
+        img = Image.fromarray(pixels).convert(mode)
+        whole = ImageToWebPConverter(fine_tuning={'auto_tone': True})._apply_fine_tuning(img.copy())
+        converter = ImageToWebPConverter(fine_tuning={'auto_tone': True}, tile_threshold=5000, tile_memory_budget=200 * 10 * 40)
+        assert converter._use_strips(img)
+        strips = converter._apply_fine_tuning(img.copy())
+        assert np.array_equal(np.asarray(whole), np.asarray(strips)), mode
+    print("✅ Strips match the whole image")
+
+def test_auto_levels_histogram():
+    """Auto levels from histograms matches the previous np.percentile float32 implementation"""
+    import numpy as np
+    
+    print("\n" + "-"*60)
+    print("Testing histogram auto levels against the array implementation...")
+    print("-"*60 + "\n")
+    
+    def reference_levels(img):
+        # Previous implementation: percentiles and stretch on a float32 copy of the image
+        adjusted = np.array(img, dtype=np.float32)
+        for i in range(3):
+            channel = adjusted[:, :, i]
+            low_percentile = np.percentile(channel, 1)
+            high_percentile = np.percentile(channel, 99)
+            if high_percentile > low_percentile:
+                channel = (channel - low_percentile) * (255.0 / (high_percentile - low_percentile))
+                adjusted[:, :, i] = np.clip(channel, 0, 255)
+        return adjusted.astype(np.uint8)
+    
+    converter = ImageToWebPConverter(fine_tuning={'auto_tone': True})
+    rng = np.random.default_rng(7)
+    images = [
+        rng.integers(0, 256, (37, 53, 3), dtype=np.uint8),
+        rng.integers(40, 200, (64, 64, 3), dtype=np.uint8),
+        rng.normal(120, 30, (101, 17, 3)).clip(0, 255).astype(np.uint8),
+        np.full((9, 9, 3), 77, dtype=np.uint8),
+    ]
+    for pixels in images:
+        img = Image.fromarray(pixels)
+        _, params = converter._auto_tone_pipeline(img)
+        assert np.array_equal(np.asarray(img.point(params['levels'])), reference_levels(img)), pixels.shape
+        for percent in (0, 1, 50, 99, 100):
+            channel = pixels[:, :, 0]
+            histogram = np.bincount(channel.ravel(), minlength=256).tolist()
+            assert converter._histogram_percentile(histogram, percent) == np.percentile(channel, percent)
+    print("✅ Bit-identical auto levels")
+
+def test_tone_engine():
+    """The chunked tone engine matches the previous whole-image float32 implementation"""
+    import numpy as np
+    
+    print("\n" + "-"*60)
+    print("Testing the tone adjustment engine against the array implementation...")
+    print("-"*60 + "\n")
+    
+    def reference_tones(img, shadows, highlights, whites, blacks):
+        # Previous implementation: full-size float32 masks stacked over the channels
+        img_array = np.array(img, dtype=np.float32)
+        luminosity = np.mean(img_array, axis=2) / 255.0
+        for mask, adjustment, scale in (
+            (np.maximum(0, 1 - (luminosity / 0.3)) ** 2, shadows, 50),
+            (np.maximum(0, (luminosity - 0.7) / 0.3) ** 2, highlights, 50),
+            (np.maximum(0, (luminosity - 0.85) / 0.15) ** 2, whites, 30),
+            (np.maximum(0, 1 - (luminosity / 0.15)) ** 2, blacks, 30),
+        ):
+            img_array += np.stack([mask] * 3, axis=2) * (adjustment / 100.0) * scale
+        return np.clip(img_array, 0, 255).astype(np.uint8)
+    
+    converter = ImageToWebPConverter()
+    rng = np.random.default_rng(9)
+    img = Image.fromarray(rng.integers(0, 256, (61, 47, 3), dtype=np.uint8))
+    for settings in ((30, 0, 0, 0), (0, -45, 0, 0), (0, 0, 60, 0), (0, 0, 0, -80), (25, -35, 40, 55), (-100, 100, -100, 100)):
+        expected = reference_tones(img, *settings)
+        for chunk_rows in (None, 1, 7, 61):
+            result = converter._adjust_tones(img, *settings, chunk_rows=chunk_rows)
+            assert np.array_equal(np.asarray(result), expected), (settings, chunk_rows)
+    print("✅ Bit-identical tone adjustments")
+
+def test_crop_region_resample():
+    """Resampling only the cropped region stays within rounding of resize-then-crop"""
+    import numpy as np
+    
+    print("\n" + "-"*60)
+    print("Testing cropped-region resampling against resize-then-crop...")
+    print("-"*60 + "\n")
+    
+    def resize_then_crop(converter, img, resized_size, crop_size):
+        # Previous implementation: resample the whole image, then take the center crop
+        resized = converter._resize(img, resized_size, (0, 0) + img.size)
+        left = (resized_size[0] - crop_size[0]) // 2
+        top = (resized_size[1] - crop_size[1]) // 2
+        return resized.crop((left, top, left + crop_size[0], top + crop_size[1]))
+    
+    def assert_close(result, expected, tolerance):
+        result = np.asarray(result, dtype=np.int16)
+        expected = np.asarray(expected, dtype=np.int16)
+        assert result.shape == expected.shape
+        difference = np.abs(result - expected)
+        assert difference.max() <= tolerance and difference.mean() < 0.01, (difference.max(), difference.mean())
+    
+    # LANCZOS weights of a sub-region round differently at a few pixels: by at most one level,
+    # or two when reduce() pre-shrinks (balanced/fast), on random noise
+    rng = np.random.default_rng(5)
+    for resample_mode, reducing_gap in ImageToWebPConverter.RESAMPLE_MODES.items():
+        tolerance = 1 if reducing_gap is None else 2
+        converter = ImageToWebPConverter(resample_mode=resample_mode)
+        for width, height, target_w, target_h in ((640, 480, 200, 200), (480, 640, 300, 120), (1000, 333, 256, 256), (97, 211, 50, 50)):
+            img = Image.fromarray(rng.integers(0, 256, (height, width, 3), dtype=np.uint8))
+            
+            # Uniform size mode
+            cover_size = converter._cover_size(width, height, target_w, target_h)
+            expected = resize_then_crop(converter, img, cover_size, (target_w, target_h))
+            assert_close(converter._crop_to_uniform_size(img, target_w, target_h), expected, tolerance)
+            
+            # make_horizontal: square center crop of a proportional resize
+            if height > width:
+                new_height = int(target_w * height / width)
+                box = converter._center_crop_box((0, 0, width, height), (target_w, new_height), (target_w, target_w))
+                expected = resize_then_crop(converter, img, (target_w, new_height), (target_w, target_w))
+                assert_close(converter._resize(img, (target_w, target_w), box), expected, tolerance)
+    print("✅ Within rounding of resize-then-crop")
+
+def test_incremental():
+    """Incremental runs skip unchanged sources and keep the output folder in step with the source"""
+    import shutil
+    import tempfile
+    import time
+    
+    print("\n" + "-"*60)
+    print("Testing incremental conversion...")
+    print("-"*60 + "\n")
+    
+    work_dir = tempfile.mkdtemp()
+    try:
+        source_folder = os.path.join(work_dir, "source")
+        output_folder = os.path.join(work_dir, "output")
+        shutil.copytree(create_test_images(), source_folder)
+        red = os.path.join(source_folder, "red.jpg")
+        blue = os.path.join(source_folder, "subfolder2", "blue.bmp")
+        
+        def convert(**options):
+            converter = ImageToWebPConverter(incremental=True, workers=1, **options)
+            _, total, processed, errors = converter.convert_folder(source_folder, output_folder)
+            assert not errors, errors
+            assert processed == total, (processed, total)
+            return processed, converter.skipped_files
+        
+        def outputs():
+            return sorted(
+                os.path.relpath(os.path.join(root, name), output_folder)
+                for root, _, names in os.walk(output_folder)
+                for name in names if name.endswith(".webp")
+            )
+        
+        assert convert() == (4, 0)
+        converted = outputs()
+        red_output = os.path.join(output_folder, "red.webp")
+        red_written = os.path.getmtime(red_output)
+        
+        # Unchanged sources are skipped
+        assert convert() == (0, 4)
+        
+        # Touched but identical: the content hash decides, nothing is converted
+        later = time.time() + 10
+        os.utime(red, (later, later))
+        assert convert() == (0, 4)
+        assert os.path.getmtime(red_output) == red_written
+        
+        # Changed content is converted again
+        Image.new('RGB', (100, 100), color='purple').save(red)
+        assert convert() == (1, 3)
+        
+        # A settings change converts everything again
+        assert convert(quality=60) == (4, 0)
+        assert convert(quality=60) == (0, 4)
+        
+        # B&W toggled on, then off: the B&W outputs are removed again
+        assert convert(quality=60, create_bw=True) == (4, 0)
+        assert len(outputs()) == 8
+        assert convert(quality=60) == (4, 0)
+        assert outputs() == converted
+        
+        # Other files in the output folder are left alone
+        user_file = os.path.join(output_folder, "notes_by_user.webp")
+        open(user_file, "wb").close()
+        
+        # Deleted sources keep their outputs unless prune_deleted is set
+        os.remove(blue)
+        assert convert(quality=60) == (0, 3)
+        assert os.path.join("subfolder2", "blue.webp") in outputs()
+        assert convert(quality=60, prune_deleted=True) == (0, 3)
+        assert os.path.join("subfolder2", "blue.webp") not in outputs()
+        assert os.path.exists(user_file)
+        print("✅ Skip, hash re-check, settings change, stale outputs and pruning")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+def test_output_cache():
+    """Output cache hits reuse encoded files, eviction drops least recently used entries"""
+    import shutil
+    import tempfile
+    import time
+    from pathlib import Path
+    from converter import OutputCache, _link_or_copy, _reflink_or_copy
+    
+    print("\n" + "-"*60)
+    print("Testing the output cache...")
+    print("-"*60 + "\n")
+    
+    test_folder = create_test_images()
+    work_dir = Path(tempfile.mkdtemp())
+    try:
+        # A second run over the same sources links the cached files instead of encoding
+        for run in ("first", "second"):
+            converter = ImageToWebPConverter(create_bw=True, cache_dir=str(work_dir / "cache"), workers=1)
+            _, total, processed, errors = converter.convert_folder(test_folder, str(work_dir / run))
+            assert not errors and processed == total, errors
+        for name in ("red.webp", "red_bw.webp", "subfolder2/nested/yellow.webp"):
+            assert os.path.samefile(work_dir / "first" / name, work_dir / "second" / name), name
+        
+        # Least recently used entries go first once the cache is over max_bytes
+        cache = OutputCache(work_dir / "lru", max_bytes=250)
+        for key in ("aa01", "bb02", "cc03"):
+            encoded = work_dir / f"{key}.webp"
+            encoded.write_bytes(b"x" * 100)
+            cache.store(key, {'color': encoded})
+            time.sleep(0.01)
+        # Storing the third entry went over the limit and evicted the oldest
+        assert cache.lookup("aa01") is None
+        assert cache.lookup("bb02") is not None
+        time.sleep(0.01)
+        encoded = work_dir / "dd04.webp"
+        encoded.write_bytes(b"x" * 100)
+        cache.store("dd04", {'color': encoded})
+        # bb02 was used more recently than cc03, so cc03 is evicted
+        assert cache.lookup("cc03") is None
+        assert cache.lookup("bb02") is not None and cache.lookup("dd04") is not None
+        
+        # A failed replace leaves no temporary file behind
+        for place in (_link_or_copy, _reflink_or_copy):
+            destination = work_dir / f"occupied_{place.__name__}"
+            destination.mkdir()
+            try:
+                place(work_dir / "dd04.webp", destination)
+            except OSError:
+                pass
+            else:
+                raise AssertionError("replacing a directory should fail")
+            assert not list(work_dir.glob("*.tmp")), place.__name__
+        print("✅ Cache hits, LRU eviction and temporary file cleanup")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+def test_fine_tuning_lut_tolerance():
+    """The fine-tuning LUT stays within FINE_TUNING_LUT_TOLERANCE of stage-by-stage processing"""
+    import numpy as np
+    
+    print("\n" + "-"*60)
+    print("Testing fine-tuning LUT accuracy...")
+    print("-"*60 + "\n")
+    
+    tolerance = ImageToWebPConverter.FINE_TUNING_LUT_TOLERANCE
+    levels = np.arange(256, dtype=np.uint8)
+    # Every 8-bit colour once, plus an ordinary image whose contrast pivot is not mid-gray
+    every_colour = Image.fromarray(np.stack(np.meshgrid(levels, levels, levels, indexing='ij'), axis=-1).reshape(4096, 4096, 3))
+    rng = np.random.default_rng(11)
+    darkish = Image.fromarray(rng.normal(90, 40, (120, 160, 3)).clip(0, 255).astype(np.uint8))
+    
+    for settings in (
+        {'exposure': 0.5, 'contrast': 30, 'saturation': 40, 'temperature': 20},
+        {'shadows': -56, 'highlights': -84, 'temperature': -62, 'exposure': 1.45},
+        {'saturation': 44, 'tint': 67, 'vibrance': 100, 'temperature': -44, 'blacks': -6},
+    ):
+        lut_converter = ImageToWebPConverter(fine_tuning=settings)
+        stage_converter = ImageToWebPConverter(fine_tuning=settings, fine_tuning_lut=False)
+        assert lut_converter._use_fine_tuning_lut()
+        for img in (every_colour, darkish):
+            assert lut_converter._get_fine_tuning_lut(img) is not None, settings
+            with_lut = np.asarray(lut_converter._apply_fine_tuning(img.copy()), dtype=np.int16)
+            stages = np.asarray(stage_converter._apply_fine_tuning(img.copy()), dtype=np.int16)
+            assert np.abs(with_lut - stages).max() <= tolerance, (settings, np.abs(with_lut - stages).max())
+    
+    # Extreme settings clip between stages beyond what the LUT can follow: they run stage by stage
+    settings = {'exposure': 2.0, 'contrast': 100, 'saturation': 100, 'vibrance': 100}
+    lut_converter = ImageToWebPConverter(fine_tuning=settings)
+    assert lut_converter._get_fine_tuning_lut(darkish) is None
+    with_lut = lut_converter._apply_fine_tuning(darkish.copy())
+    stages = ImageToWebPConverter(fine_tuning=settings, fine_tuning_lut=False)._apply_fine_tuning(darkish.copy())
+    assert np.array_equal(np.asarray(with_lut), np.asarray(stages))
+    print(f"✅ Within {tolerance} levels, extreme settings fall back to the stages")
+
+def test_encoder_thread_reuse():
+    """Color and B&W versions share one helper encoder thread for the whole run"""
+    import pickle
+    import shutil
+    import tempfile
+    
+    print("\n" + "-"*60)
+    print("Testing helper encoder thread reuse...")
+    print("-"*60 + "\n")
+    
+    test_folder = create_test_images()
+    work_dir = tempfile.mkdtemp()
+    try:
+        for run, options in enumerate(({}, {'target_widths': [80, 40]}, {'pipeline': True})):
+            converter = ImageToWebPConverter(create_bw=True, workers=1, **options)
+            executors = []
+            get_encoder_thread = converter._get_encoder_thread
+            converter._get_encoder_thread = lambda: executors.append(get_encoder_thread()) or executors[-1]
+            _, total, processed, errors = converter.convert_folder(test_folder, os.path.join(work_dir, f"out_{run}"))
+            assert not errors and processed == total, errors
+            # One B&W pair per image (per width in responsive mode), all on the same thread
+            assert len(executors) >= total and len(set(map(id, executors))) == 1, options
+            assert converter._encoder_thread is None
+        
+        # Worker processes get their own lock and thread
+        copy = pickle.loads(pickle.dumps(ImageToWebPConverter(create_bw=True)))
+        copy._record_encode_rate(1000, 4, 0.001)
+        assert copy._encoder_thread is None
+        print("✅ One helper encoder thread per run")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
 if __name__ == "__main__":
     test_conversion()
+    test_adaptive_bw_with_cache()
+    test_passthrough_rerun()
+    test_single_file_versioning()
+    test_memory_admission()
+    test_header_cache()
+    test_strip_auto_tone()
+    test_auto_levels_histogram()
+    test_tone_engine()
+    test_crop_region_resample()
+    test_incremental()
+    test_output_cache()
+    test_fine_tuning_lut_tolerance()
+    test_encoder_thread_reuse()